@@ -0,0 +1,353 @@
+"""
+Benchmarks for the XmR pipeline. Each stage is timed separately on synthetic data, so
+no network access or input files are needed.
+
+Usage:
+    python benchmarks/bench_xmr.py --output results.json
+    python benchmarks/bench_xmr.py --sizes 100 10000 --datasets short_runs
+    python benchmarks/bench_xmr.py --compare baseline.json results.json
+
+Results are written as JSON: one record per dataset, size and stage with the best and
+mean time of the repeats, along with the library versions and platform. Two result
+files can be compared to see which stages became faster or slower between releases.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+
+import numpy as np
+from pandas import DataFrame, date_range, to_datetime
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+
+from spc_plotly import validation, xmr  # noqa: E402
+from spc_plotly.helpers import figure_json, signals  # noqa: E402
+from spc_plotly.utils import baseline_index, changepoints, merge_intervals  # noqa: E402
+
+SIZES = [10**2, 10**3, 10**4, 10**5, 10**6]
+DATASETS = ["noise", "short_runs", "long_runs"]
+
+# Building and serializing a figure is much slower than the statistics, so figures
+#   are only benchmarked up to this size by default
+MAX_FIGURE_SIZE = 10**5
+
+
+def make_data(dataset: str, size: int, seed: int = 0) -> DataFrame:
+    """
+    Builds a synthetic series of minute-resolution data
+
+    Parameters:
+        dataset (str): Signal density of the series
+            - noise: normally distributed values, few signals
+            - short_runs: blocks of 4 points alternating above and below the mid line,
+                so almost every window of 4 points is a short run and the runs overlap
+            - long_runs: blocks of 10 points alternating above and below the mid line,
+                so the series is made of long runs and points outside the limits
+        size (int): Number of points
+        seed (int): Random seed
+
+    Returns:
+        DataFrame: Dataframe with a "Timestamp" column of strings and a "Value" column
+    """
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(0, 1, size)
+    if dataset == "noise":
+        y = 100 + 5 * noise
+    elif dataset == "short_runs":
+        y = 100 + 10 * np.where((np.arange(size) // 4) % 2 == 0, 1, -1) + 0.5 * noise
+    elif dataset == "long_runs":
+        y = 100 + 10 * np.where((np.arange(size) // 10) % 2 == 0, 1, -1) + 0.5 * noise
+    else:
+        e = f"{dataset} not a valid dataset. Must be {DATASETS}"
+        raise ValueError(e)
+
+    timestamps = date_range("2020-01-01", periods=size, freq="min")
+
+    return DataFrame({"Timestamp": timestamps.strftime("%Y-%m-%d %H:%M"), "Value": y})
+
+
+def timed(func, repeat: int) -> tuple[float, float]:
+    """
+    Times a function
+
+    Parameters:
+        func (callable): Function to time, called without arguments
+        repeat (int): Number of times to call the function
+
+    Returns:
+        tuple: Best and mean time, in seconds
+    """
+    times = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return min(times), sum(times) / len(times)
+
+
+def uncached(stats: xmr.XmRStats, name: str):
+    """
+    Builds a cached property of an XmRStats object again
+
+    Parameters:
+        stats (XmRStats): Statistics object
+        name (str): Name of property, e.g., "signal_events"
+
+    Returns:
+        Value of the property
+    """
+    setattr(stats, f"_{name}", None)
+
+    return getattr(stats, name)
+
+
+def stages(data: DataFrame, max_figure_size: int) -> dict:
+    """
+    Prepares the inputs of each stage of the pipeline
+
+    Parameters:
+        data (DataFrame): Data to benchmark
+        max_figure_size (int): Largest size for which figure stages are included
+
+    Returns:
+        dict: Function timing each stage, by stage name
+    """
+    size = data.shape[0]
+    x_begin = data["Timestamp"].iloc[size // 10]
+    x_cutoff = data["Timestamp"].iloc[size // 2]
+    kwargs = dict(
+        data=data,
+        y_ser_name="Value",
+        x_ser_name="Timestamp",
+        x_begin=x_begin,
+        x_cutoff=x_cutoff,
+        date_part_resolution="minute",
+    )
+
+    stats = {
+        "mean": xmr.XmRStats(**kwargs),
+        "median": xmr.XmRStats(**kwargs, xmr_function="median"),
+        "sloped": xmr.XmRStats(**kwargs, sloped=True),
+        "rolling": xmr.XmRStats(**kwargs, window=100),
+        "phases": xmr.XmRStats(
+            **kwargs, phases=list(data["Timestamp"].iloc[size // 4 :: size // 4])
+        ),
+    }
+    x_dt = to_datetime(data["Timestamp"])
+    y = data["Value"].to_numpy()
+    mR = stats["mean"].mR_data.to_numpy()
+    y_xmr_func, npl_upper, npl_lower = stats["mean"]._limit_arrays()
+    windows = signals._short_run_windows(y, npl_upper, npl_lower, y_xmr_func)
+
+    result = {
+        "parse_dates": lambda: (
+            validation.validate_x_ser_is_date(data["Timestamp"]),
+            to_datetime(data["Timestamp"]),
+        ),
+        "baseline": lambda: baseline_index.baseline_index(
+            x_dt, x_begin, x_cutoff, "%Y-%m-%d %H:%M", "m"
+        ),
+        "limits_mean": stats["mean"]._limits,
+        "limits_median": stats["median"]._limits,
+        "limits_sloped": stats["sloped"]._limits,
+        "limits_rolling": stats["rolling"]._limits,
+        "limits_phases": lambda: (
+            stats["phases"]._phase_limits(),
+            stats["phases"]._limits(),
+        ),
+        "anomalies": lambda: (
+            signals._outside_limits(y, npl_upper, npl_lower),
+            signals._mR_outside_limit(
+                mR, stats["mean"].mR_limit_values.get("mR_upper_limit")
+            ),
+        ),
+        "long_runs": lambda: merge_intervals.merge_intervals(
+            *signals._long_run_windows(y, y_xmr_func)
+        ),
+        "short_runs": lambda: merge_intervals.merge_intervals(
+            *signals._short_run_windows(y, npl_upper, npl_lower, y_xmr_func)
+        ),
+        "merge_intervals": lambda: merge_intervals.merge_intervals(*windows),
+        # The long_runs dataset shifts every 10 points, the worst case for binary
+        #   segmentation, so the number of changepoints is capped
+        "changepoints": lambda: changepoints.changepoints(y, max_changepoints=10),
+        "signal_events": lambda: uncached(stats["mean"], "signal_events"),
+        "signal_masks": lambda: uncached(stats["mean"], "signal_masks"),
+        "signal_points": lambda: uncached(stats["mean"], "signals"),
+        "stats_total": lambda: xmr.XmRStats(**kwargs),
+    }
+
+    if size <= max_figure_size:
+        chart = xmr.XmR(**kwargs)
+        fig = chart.xmr_chart
+        result["figure"] = chart._XmR_chart
+        result["to_json"] = fig.to_json
+        result["figure_json"] = lambda: figure_json._figure_json(fig)
+
+    return result
+
+
+def run(
+    sizes: list, datasets: list, repeat: int, max_figure_size: int, verbose: bool
+) -> dict:
+    """
+    Runs the benchmarks
+
+    Parameters:
+        sizes (list[int]): Number of points of each series
+        datasets (list[str]): Signal densities, see make_data
+        repeat (int): Number of times each stage is timed
+        max_figure_size (int): Largest size for which figure stages are included
+        verbose (bool): Print each result as it is measured
+
+    Returns:
+        dict: Environment details and one record per dataset, size and stage
+    """
+    results = []
+    for dataset in datasets:
+        for size in sizes:
+            data = make_data(dataset, size)
+            for stage, func in stages(data, max_figure_size).items():
+                # Stages on large series are slow and stable, so they are repeated less
+                n = max(1, repeat if size < 10**5 else repeat // 3)
+                best, mean = timed(func, n)
+                results.append(
+                    {
+                        "dataset": dataset,
+                        "size": size,
+                        "stage": stage,
+                        "best": best,
+                        "mean": mean,
+                        "repeat": n,
+                    }
+                )
+                if verbose:
+                    print(f"{dataset:>10} {size:>8} {stage:>16} {best * 1000:10.3f} ms")
+
+    return {"environment": environment(), "results": results}
+
+
+def environment() -> dict:
+    """
+    Returns:
+        dict: Versions and platform the benchmarks were run on
+    """
+    versions = {}
+    for package in ["spc-plotly", "numpy", "pandas", "plotly"]:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "versions": versions,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """
+    Compares two benchmark results
+
+    Parameters:
+        baseline (dict): Results to compare against
+        current (dict): New results
+        threshold (float): Ratio of current to baseline time above which a stage is
+            reported as slower, e.g., 1.1 for 10%
+
+    Returns:
+        list[tuple]: (dataset, size, stage, baseline time, current time, ratio, status)
+            for each stage present in both results
+    """
+    key = lambda r: (r["dataset"], r["size"], r["stage"])  # noqa: E731
+    baseline_times = {key(r): r["best"] for r in baseline["results"]}
+
+    rows = []
+    for r in current["results"]:
+        if key(r) not in baseline_times:
+            continue
+        before, after = baseline_times[key(r)], r["best"]
+        ratio = after / before if before > 0 else float("inf")
+        if ratio > threshold:
+            status = "slower"
+        elif ratio < 1 / threshold:
+            status = "faster"
+        else:
+            status = ""
+        rows.append((*key(r), before, after, ratio, status))
+
+    return rows
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the XmR pipeline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--datasets", nargs="+", default=DATASETS, choices=DATASETS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-figure-size", type=int, default=MAX_FIGURE_SIZE)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BASELINE", "CURRENT"),
+        help="Compare two result files instead of running the benchmarks",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.1,
+        help="Ratio above which a stage is reported as slower (default 1.1)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+
+        rows = compare(baseline, current, args.threshold)
+        print(
+            f"{'dataset':>10} {'size':>8} {'stage':>16} "
+            f"{'baseline ms':>12} {'current ms':>12} {'ratio':>7}"
+        )
+        for dataset, size, stage, before, after, ratio, status in rows:
+            print(
+                f"{dataset:>10} {size:>8} {stage:>16} "
+                f"{before * 1000:12.3f} {after * 1000:12.3f} {ratio:7.2f} {status}"
+            )
+
+        # Non-zero exit code so the comparison can fail a CI job
+        return 1 if any(row[-1] == "slower" for row in rows) else 0
+
+    results = run(
+        args.sizes, args.datasets, args.repeat, args.max_figure_size, verbose=True
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
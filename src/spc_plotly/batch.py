@@ -0,0 +1,395 @@
+from typing import TYPE_CHECKING
+from pandas import DataFrame, Index, Series, factorize, to_datetime
+from numpy import (
+    abs,
+    arange,
+    bincount,
+    concatenate,
+    cumsum,
+    lexsort,
+    maximum,
+    ndarray,
+    ones,
+    roll,
+    searchsorted,
+    where,
+    zeros,
+)
+from spc_plotly.helpers import signals
+from spc_plotly.utils import baseline_index, changepoints, merge_intervals
+from spc_plotly.xmr import XmR, XmR_constants, date_parts, date_units
+from spc_plotly import validation
+
+if TYPE_CHECKING:
+    from plotly.graph_objects import Figure
+
+
+class XmRBatch:
+    """
+    A class representing the limits and signals of many XmR charts, calculated from one
+    long-format dataframe with a row per metric and period. Every metric is processed in
+    the same vectorized pass, and a Plotly figure is only built for the metrics that are
+    requested with `figure`.
+
+    Attributes:
+        data (DataFrame): Dataframe containing all metrics.
+        group_ser_name (str): Name of column identifying the metric of each row.
+        y_ser_name (str): Name of column containing values to plot on y-axis.
+        x_ser_name (str): Name of column or index containing values to plot on x-axis.
+        sloped (bool): Use sloping approach for limit values.
+        xmr_function (str): Use "mean" or "median" function for calculating limit values
+        limits (DataFrame): One row per metric with its moving range and natural process
+            limits. If sloped, the mid-line at position i (starting at 0) of a metric is
+            (i + 1) * slope + intercept, and the natural process limits are the mid-line
+            plus or minus mR_upper_limit.
+        signals (DataFrame): One row per signal with its rule ("anomaly", "long_run" or
+            "short_run"), direction ("High" or "Low"), first and last position within
+            the metric, first and last x-value, and number of points.
+    """
+
+    def __init__(
+        self,
+        data: DataFrame,
+        group_ser_name: str,
+        y_ser_name: str,
+        x_ser_name: str,
+        x_begin: str = None,
+        x_cutoff: str = None,
+        date_part_resolution: str = "month",
+        custom_date_part: str = "",
+        sloped: bool = False,
+        xmr_function: str = "mean",
+    ) -> None:
+        """
+        Initializes an XmR batch object.
+
+        Parameters:
+            data (DataFrame): Dataframe containing all metrics.
+            group_ser_name (str): Name of column identifying the metric of each row.
+            y_ser_name (str): Name of column containing values to plot on y-axis.
+            x_ser_name (str): Name of column or index containing values to plot on
+                x-axis. Column or index should represent a date, date/time, or a proxy
+                for such (e.g., increasing integer value)
+            x_begin (str): Value of x_ser_name, before which the data is excluded for
+                purposes of calculating limits. If None, all data is included.
+            x_cutoff (str): Value of x_ser_name, after which the data is excluded for
+                purposes of calculating limits. If None, all data is included. Every
+                metric must have rows between x_begin and x_cutoff.
+            date_part_resolution (str): Resolution of your data. See XmR for valid
+                options.
+            custom_date_part (str): If you choose custom, please specify the d3 format
+                corresponding to your data.
+            sloped (bool): Use sloping approach for limit values. Only use this if your
+                data is expected to increase over time (e.g., energy prices).
+            xmr_function (str): Use "mean" or "median" function for calculating limit
+                values
+        """
+
+        self.data = data
+        self.xmr_function = xmr_function.lower()
+        self.sloped = sloped
+        self.date_part_resolution = date_part_resolution.lower()
+        if self.date_part_resolution == "custom":
+            self.custom_date_part = custom_date_part
+        else:
+            self.custom_date_part = date_parts.get(self.date_part_resolution, None)
+
+        validation.validate_inputs(self, date_parts)
+
+        validation.validate_group_ser_name_val(group_ser_name, data)
+        validation.validate_y_ser_name_val(y_ser_name, data)
+        validation.validate_x_ser_name_val(x_ser_name, data)
+        self._group_ser_name = group_ser_name
+        self._y_ser_name = y_ser_name
+        self._x_ser_name = x_ser_name
+        self.x_begin = x_begin
+        self.x_cutoff = x_cutoff
+
+        x_Ser = (
+            data[x_ser_name]
+            if x_ser_name in data.columns
+            else data.index.to_series(name=x_ser_name)
+        )
+        validation.validate_x_ser_is_date(x_Ser)
+        x_dt = to_datetime(x_Ser).to_numpy()
+
+        # Sort rows by metric, then by x-value, so each metric is a contiguous block
+        codes, groups = factorize(data[group_ser_name].to_numpy(), sort=True)
+        self._groups = Index(groups, name=group_ser_name)
+        self._order = lexsort((x_dt, codes))
+        self._codes = codes[self._order]
+        self._x_dt = x_dt[self._order]
+        self._y = data[y_ser_name].to_numpy(dtype=float)[self._order]
+
+        self._bounds = searchsorted(self._codes, arange(len(self._groups) + 1))
+        self._first = self._bounds[self._codes]
+        self._position = arange(self._y.shape[0]) - self._first
+        self._baseline = self._baseline_mask()
+
+        # A metric without baseline rows has no limits, and XmR can not chart it
+        n_baseline = bincount(self._codes[self._baseline], minlength=len(groups))
+        no_baseline = groups[n_baseline == 0]
+        if len(no_baseline) > 0:
+            e = f"No rows between x_begin and x_cutoff for {list(no_baseline)}"
+            raise ValueError(e)
+
+        # Set constant values for mean or median
+        self.mR_Upper_Constant = XmR_constants.get(self.xmr_function).get("mR_Upper")
+        self.npl_Constant = XmR_constants.get(self.xmr_function).get("npl_Constant")
+
+        self.limits = self._limits()
+        self.signals = self._signals()
+
+    def _baseline_mask(self) -> ndarray:
+        """
+        Flags the rows used to calculate limits, i.e., rows between x_begin and x_cutoff
+
+        Returns:
+            ndarray: True for each (sorted) row that is part of the baseline
+        """
+        if self.x_begin is None and self.x_cutoff is None:
+            return ones(self._y.shape[0], dtype=bool)
+
+        date_unit = date_units.get(self.date_part_resolution)
+        if date_unit is not None:
+            x_dt = Series(self._x_dt)
+            if x_dt.dt.tz is not None:
+                # Labels show local time, so bounds are compared in local time too
+                x_dt = x_dt.dt.tz_localize(None)
+            baseline = baseline_index.baseline_index(
+                x_dt,
+                self.x_begin,
+                self.x_cutoff,
+                self.custom_date_part,
+                date_unit,
+                x_name=self._x_ser_name,
+            )
+            mask = zeros(self._y.shape[0], dtype=bool)
+            mask[baseline] = True
+
+            return mask
+
+        # Custom formats are compared as formatted labels
+        x_Ser = Series(self._x_dt, name=self._x_ser_name).dt.strftime(
+            self.custom_date_part
+        )
+        validation.validate_begin_val(self.x_begin, x_Ser)
+        validation.validate_cutoff_val(self.x_cutoff, x_Ser)
+
+        mask = ones(self._y.shape[0], dtype=bool)
+        if self.x_begin is not None:
+            mask &= (x_Ser >= self.x_begin).to_numpy()
+        if self.x_cutoff is not None:
+            mask &= (x_Ser <= self.x_cutoff).to_numpy()
+
+        return mask
+
+    def _group_func(self, values: ndarray, mask: ndarray) -> ndarray:
+        """
+        Calculates the mean/median of the masked values of each metric
+
+        Parameters:
+            values (ndarray): Array of values, one per (sorted) row
+            mask (ndarray): True for each row to include
+
+        Returns:
+            ndarray: Mean or median value of each metric. NaN if a metric has no rows
+                to include.
+        """
+        grouped = Series(values[mask]).groupby(self._codes[mask])
+        result = grouped.mean() if self.xmr_function == "mean" else grouped.median()
+
+        return result.reindex(arange(len(self._groups))).to_numpy()
+
+    def _limits(self) -> DataFrame:
+        """
+        Calculates the limits of every metric in one pass.
+
+        Returns:
+            DataFrame: One row per metric with its moving range and natural process
+                limits
+        """
+        self._mR = abs(self._y - roll(self._y, 1))
+        self._mR[self._position == 0] = float("nan")
+
+        # A moving range is only part of the baseline if both of its points are
+        mR_baseline = self._baseline & roll(self._baseline, 1) & (self._position > 0)
+
+        mR_xmr_func = self._group_func(self._mR, mR_baseline)
+        mR_upper = mR_xmr_func * self.mR_Upper_Constant
+
+        limits = DataFrame(
+            {
+                "n_points": self._bounds[1:] - self._bounds[:-1],
+                "n_baseline": Series(self._baseline)
+                .groupby(self._codes)
+                .sum()
+                .reindex(arange(len(self._groups)), fill_value=0)
+                .to_numpy(),
+                "mR_xmr_func": mR_xmr_func,
+                "mR_upper_limit": mR_upper,
+            },
+            index=self._groups,
+        )
+
+        if self.sloped:
+            # Same approach as XmR: the slope is derived from the mean/median of the
+            #   first and second half of each metric's baseline
+            n_baseline = limits["n_baseline"].to_numpy()
+            baseline_counts = concatenate(([0], cumsum(self._baseline)))
+            baseline_rank = baseline_counts[1:] - 1 - baseline_counts[self._first]
+            half_idx = n_baseline // 2
+            first_half = self._baseline & (baseline_rank < half_idx[self._codes])
+            second_half = self._baseline & (baseline_rank >= half_idx[self._codes])
+
+            first_half_idx = half_idx // 2
+            second_half_idx = (n_baseline - half_idx) // 2
+            x_delta = (half_idx + second_half_idx) - first_half_idx
+
+            first_half_func = self._group_func(self._y, first_half)
+            m = (self._group_func(self._y, second_half) - first_half_func) / x_delta
+            b = first_half_func - (m * first_half_idx)
+
+            limits["slope"] = m
+            limits["intercept"] = b
+
+            self._y_xmr_func = ((self._position + 1) * m[self._codes]) + b[self._codes]
+            self._npl_upper = self._y_xmr_func + mR_upper[self._codes]
+            self._npl_lower = self._y_xmr_func - mR_upper[self._codes]
+        else:
+            y_xmr_func = self._group_func(self._y, self._baseline)
+            npl_upper = y_xmr_func + (self.npl_Constant * mR_xmr_func)
+            npl_lower = maximum(y_xmr_func - (self.npl_Constant * mR_xmr_func), 0)
+
+            limits["y_xmr_func"] = y_xmr_func
+            limits["npl_upper_limit"] = npl_upper
+            limits["npl_lower_limit"] = npl_lower
+
+            self._y_xmr_func = y_xmr_func[self._codes]
+            self._npl_upper = npl_upper[self._codes]
+            self._npl_lower = npl_lower[self._codes]
+
+        limits["xmr_func"] = self.xmr_function
+
+        return limits.reset_index()
+
+    def _signals(self) -> DataFrame:
+        """
+        Identifies the signals of every metric in one pass.
+
+        Returns:
+            DataFrame: One row per signal
+        """
+        rules = {
+            "anomaly": signals._outside_limits(
+                self._y, self._npl_upper, self._npl_lower
+            ),
+            "long_run": merge_intervals.merge_intervals(
+                *signals._long_run_windows(self._y, self._y_xmr_func, self._first)
+            ),
+            "short_run": merge_intervals.merge_intervals(
+                *signals._short_run_windows(
+                    self._y,
+                    self._npl_upper,
+                    self._npl_lower,
+                    self._y_xmr_func,
+                    self._first,
+                )
+            ),
+        }
+
+        starts, stops, is_high, rule = signals._signal_events(rules)
+        ends = stops - 1
+
+        return DataFrame(
+            {
+                self._group_ser_name: self._groups[self._codes[starts]],
+                "rule": rule.astype(object),
+                "direction": where(is_high, "High", "Low").astype(object),
+                "start_idx": self._position[starts],
+                "end_idx": self._position[ends],
+                "start_x": self._x_dt[starts],
+                "end_x": self._x_dt[ends],
+                "n_points": stops - starts,
+            }
+        )
+
+    def changepoints(
+        self, min_size: int = 8, penalty: float = None, max_changepoints: int = None
+    ) -> DataFrame:
+        """
+        Detects the shifts in the level of every metric, which can be passed to XmR as
+            phases. See utils.changepoints for the parameters.
+
+        Parameters:
+            min_size (int): Fewest points in a phase
+            penalty (float): Reduction in the sum of squares, in units of the process
+                variance, that a split must exceed. If None, 2 * log(n) is used.
+            max_changepoints (int): Most changepoints per metric
+
+        Returns:
+            DataFrame: One row per changepoint with its metric, and the position within
+                the metric and x-value of the first point of the new phase
+        """
+        codes, starts = [], []
+        for code in range(len(self._groups)):
+            begin, end = self._bounds[code], self._bounds[code + 1]
+            idx = changepoints.changepoints(
+                self._y[begin:end], min_size, penalty, max_changepoints
+            )
+            codes.append(zeros(idx.shape[0], dtype=int) + code)
+            starts.append(idx + begin)
+
+        codes = concatenate(codes) if codes else zeros(0, dtype=int)
+        starts = concatenate(starts) if starts else zeros(0, dtype=int)
+
+        return DataFrame(
+            {
+                self._group_ser_name: self._groups[codes],
+                "start_idx": self._position[starts],
+                "start_x": self._x_dt[starts],
+            }
+        )
+
+    def figure(self, group, title: str = None, chart_height: int = None) -> "Figure":
+        """
+        Builds the XmR chart of one metric
+
+        Parameters:
+            group: Value of group_ser_name identifying the metric
+            title (str): Custom chart title
+            chart_height (int): Adjust chart height
+
+        Returns:
+            Figure: XmR chart figure object
+        """
+        code = self._groups.get_loc(group)
+        rows = self._order[self._bounds[code] : self._bounds[code + 1]]
+
+        return XmR(
+            data=self.data.iloc[rows],
+            y_ser_name=self._y_ser_name,
+            x_ser_name=self._x_ser_name,
+            x_begin=self.x_begin,
+            x_cutoff=self.x_cutoff,
+            date_part_resolution=self.date_part_resolution,
+            custom_date_part=self.custom_date_part,
+            title=(
+                f"{group} XmR Chart by {self._x_ser_name}" if title is None else title
+            ),
+            sloped=self.sloped,
+            xmr_function=self.xmr_function,
+            chart_height=chart_height,
+        ).xmr_chart
+
+    def figures(self, groups: list) -> dict:
+        """
+        Builds the XmR charts of the selected metrics
+
+        Parameters:
+            groups (list): Values of group_ser_name identifying the metrics
+
+        Returns:
+            dict: XmR chart figure object of each metric
+        """
+        return {group: self.figure(group) for group in groups}
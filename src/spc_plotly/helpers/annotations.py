@@ -53,6 +53,7 @@ def _create_limit_line_annotations(
     npl_lower,
     y_name: str,
     sloped: bool,
+    per_point: bool = False,
 ):
     """
     Annotation formatter. For documentation, see plotly's official docs
@@ -60,14 +61,19 @@ def _create_limit_line_annotations(
     Parameters:
         data (DataFrame): All data
         chart_title (str): Chart title
-        y_xmr_func (float|list): Natural process limit mid-line.
-            If sloped is True, this is a list of tuples.
+        y_xmr_func (float|ndarray): Natural process limit mid-line.
+            If sloped is True, this is an array with a value per point.
         mr_Upper (float|list): Upper moving range limit.
         mR_xmr_func (float|list): Moving range mid-line.
-        npl_upper (float|list): Upper process limit. If sloped is True, this is a list of tuples.
-        npl_lower (float|list): Lower process limit. If sloped is True, this is a list of tuples.
+        npl_upper (float|ndarray): Upper process limit.
+            If sloped is True, this is an array with a value per point.
+        npl_lower (float|ndarray): Lower process limit.
+            If sloped is True, this is an array with a value per point.
         y_name (str): Y-axis title.
         sloped (bool): Use sloping approach for limit values.
+        per_point (bool): Limits have a value per point (i.e., calculated over a
+            window or per phase). The latest limit values are shown, at the right end
+            of the lines.
 
     Returns:
         dict: Axis formatting
@@ -78,6 +84,17 @@ def _create_limit_line_annotations(
     other_xanchor = "left"
     other_xref = "paper"
 
+    if per_point:
+        y_xmr_func, mR_upper, mR_xmr_func, npl_upper, npl_lower = (
+            y_xmr_func[-1],
+            mR_upper[-1],
+            mR_xmr_func[-1],
+            npl_upper[-1],
+            npl_lower[-1],
+        )
+        other_x = 0.99
+        other_xanchor = "right"
+
     # Create natural limits, mid-range lines, and center line annotations
     annotations = [
         _limit_line_annotation(
@@ -105,7 +122,7 @@ def _create_limit_line_annotations(
     if sloped:
         # If using sloped lines, find the middle of the first and second half of the chart
 
-        value_range = npl_upper[len(npl_upper) - 1][1] - npl_lower[0][1]
+        value_range = npl_upper[-1] - npl_lower[0]
 
         half_idx = data.shape[0] // 2
         first_half_idx = data.values[:half_idx].shape[0] // 2
@@ -116,25 +133,25 @@ def _create_limit_line_annotations(
         x_annotations = [
             _limit_line_annotation(
                 font=other_font,
-                text=f"<b>{round(y_xmr_func[first_half_idx][1],2)} "
+                text=f"<b>{round(y_xmr_func[first_half_idx],2)} "
                 + "\u00B1"
                 + f" {round(mR_xmr_func,2)}<b>",
                 x=first_half_loc,
                 xanchor="center",
                 xref="paper",
-                y=npl_upper[first_half_idx][1] + (value_range * 0.1),
+                y=npl_upper[first_half_idx] + (value_range * 0.1),
                 yanchor="auto",
                 yref="y",
             ),
             _limit_line_annotation(
                 font=other_font,
-                text=f"<b>{round(y_xmr_func[second_half_idx+half_idx][1],2)} "
+                text=f"<b>{round(y_xmr_func[second_half_idx+half_idx],2)} "
                 + "\u00B1"
                 + f" {round(mR_xmr_func,2)}<b>",
                 x=second_half_loc,
                 xanchor="center",
                 xref="paper",
-                y=npl_lower[half_idx + second_half_idx][1] - (value_range * 0.1),
+                y=npl_lower[half_idx + second_half_idx] - (value_range * 0.1),
                 yanchor="auto",
                 yref="y",
             ),
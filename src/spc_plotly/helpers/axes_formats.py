@@ -1,4 +1,5 @@
 from pandas import Series
+from numpy import nanmax, nanmin, ndarray
 import plotly.graph_objects as go
 from spc_plotly.utils import rounded_value, rounding_multiple
 
@@ -60,23 +61,29 @@ def _format_yaxis(
 
 
 def _format_XmR_axes(
-    npl_upper: float | list,
-    npl_lower: float | list,
-    mR_upper: float,
+    npl_upper: float | ndarray,
+    npl_lower: float | ndarray,
+    mR_upper: float | ndarray,
     y_Ser: Series,
     mR_data: Series,
     sloped: bool,
+    per_point: bool = False,
 ) -> go.Figure:
     """
     Apply axes formats
 
     Parameters:
-        npl_upper (float|list): Upper process limit. If sloped is True, this is a list of tuples.
-        npl_lower (float|list): Lower process limit. If sloped is True, this is a list of tuples.
-        mR_upper (float): Upper moving range limit.
+        npl_upper (float|ndarray): Upper process limit. If sloped or per_point is
+            True, this is an array with a value per point.
+        npl_lower (float|ndarray): Lower process limit. If sloped or per_point is
+            True, this is an array with a value per point.
+        mR_upper (float|ndarray): Upper moving range limit. If per_point is True,
+            this is an array with a value per point.
         y_Ser (Series): Series of y-values
         mR_data (Series): Series of moving range values
         sloped (bool): Use sloping approach for limit values.
+        per_point (bool): Limits have a value per point (i.e., calculated over a
+            window or per phase). The axes cover the highest and lowest limit values.
 
     Returns:
         dict: Axis formatting
@@ -85,13 +92,18 @@ def _format_XmR_axes(
     xaxis_values = _format_xaxis(anchor="y", matches="x", showticklabels=True)
     xaxis_mR = _format_xaxis(anchor="y2", matches="x2", showticklabels=False)
 
+    if per_point:
+        npl_upper, npl_lower, mR_upper = (
+            nanmax(npl_upper),
+            nanmin(npl_lower),
+            nanmax(mR_upper),
+        )
+
     if sloped:
-        value_range = npl_upper[len(npl_upper) - 1][1] - npl_lower[0][1]
+        value_range = npl_upper[-1] - npl_lower[0]
         dtick = rounding_multiple.rounding_multiple(value_range)
-        min_range = rounded_value.rounded_value(npl_lower[0][1], dtick)
-        max_range = rounded_value.rounded_value(
-            npl_upper[len(npl_upper) - 1][1], dtick, "up"
-        )
+        min_range = rounded_value.rounded_value(npl_lower[0], dtick)
+        max_range = rounded_value.rounded_value(npl_upper[-1], dtick, "up")
     else:
         value_range = npl_upper - npl_lower
         dtick = rounding_multiple.rounding_multiple(value_range)
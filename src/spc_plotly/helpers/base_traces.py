@@ -1,10 +1,14 @@
 from pandas import Series
-from plotly.graph_objects import Figure, Scatter
+from plotly.graph_objects import Figure, Scatter, Scattergl
 from plotly.subplots import make_subplots
 
 
 def _base_traces(
-    x_Ser: Series, x_Ser_dt: Series, y_Ser: Series, mr_Data: Series
+    x_Ser: Series,
+    x_Ser_dt: Series,
+    y_Ser: Series,
+    mr_Data: Series,
+    webgl: bool = False,
 ) -> Figure:
     """
     Create base traces for XmR chart
@@ -14,11 +18,14 @@ def _base_traces(
         x_Ser_dt (Series): Series of x-values, datetime format
         y_Ser (Series): Series of y-values
         mR_data (Series): Series of moving range values
+        webgl (bool): Use WebGL (Scattergl) traces instead of SVG (Scatter) traces
 
     Returns:
         Figure: Base XmR figure object
     """
 
+    trace = Scattergl if webgl else Scatter
+
     # Add XmR traces to figure
     fig = make_subplots(
         rows=2,
@@ -27,11 +34,10 @@ def _base_traces(
         vertical_spacing=0.5,
         shared_xaxes=True,
         shared_yaxes=False,
-        column_titles=list(x_Ser),
     )
 
     fig.add_trace(
-        Scatter(
+        trace(
             x=x_Ser,
             y=y_Ser,
             name=y_Ser.name,
@@ -46,7 +52,7 @@ def _base_traces(
         col=1,
     )
     fig.add_trace(
-        Scatter(
+        trace(
             x=x_Ser,
             y=mr_Data,
             name="Moving Range (mR)",
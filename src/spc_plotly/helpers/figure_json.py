@@ -0,0 +1,156 @@
+from base64 import b64encode
+from numpy import ascontiguousarray, datetime_as_string, iinfo, ndarray
+from plotly import __version__ as plotly_version
+from plotly.graph_objects import Figure
+from plotly.io.json import to_json_plotly
+
+# Plotly 6 and later encode numeric arrays as typed arrays in Figure.to_json
+plotly_typed_arrays = int(plotly_version.split(".")[0]) >= 6
+
+# plotly.js typed array name of each NumPy dtype. Other dtypes are sent as lists.
+typed_array_dtypes = {
+    "int8": "i1",
+    "uint8": "u1",
+    "int16": "i2",
+    "uint16": "u2",
+    "int32": "i4",
+    "uint32": "u4",
+    "float32": "f4",
+    "float64": "f8",
+}
+
+# 64-bit integers are not supported by plotly.js, so they are sent as the smallest
+#   integer dtype that holds every value
+downcast_dtypes = {
+    "int64": ["int8", "int16", "int32"],
+    "uint64": ["uint8", "uint16", "uint32"],
+}
+
+# Properties that Plotly never encodes as typed arrays
+skipped_keys = ("geojson", "layer", "layers", "range")
+
+
+def _typed_array(values: ndarray) -> dict | ndarray:
+    """
+    Encodes a numeric array as a plotly.js typed array: the name of its dtype and its
+        bytes in base64, as Figure.to_dict does from Plotly 6.
+
+    Parameters:
+        values (ndarray): Array of values
+
+    Returns:
+        dict|ndarray: Typed array spec ({"dtype", "bdata"}), or the array itself if it
+            is empty or its dtype has no typed array (e.g., labels or large integers)
+    """
+    if values.size == 0:
+        return values
+
+    dtype = str(values.dtype)
+    if dtype in downcast_dtypes:
+        low, high = values.min(), values.max()
+        for candidate in downcast_dtypes[dtype]:
+            if iinfo(candidate).min <= low and high <= iinfo(candidate).max:
+                values = values.astype(candidate)
+                dtype = candidate
+                break
+        else:
+            return values
+
+    if dtype not in typed_array_dtypes:
+        return values
+
+    spec = {
+        "dtype": typed_array_dtypes[dtype],
+        "bdata": b64encode(ascontiguousarray(values)).decode("ascii"),
+    }
+    if values.ndim > 1:
+        spec["shape"] = str(values.shape)[1:-1]
+
+    return spec
+
+
+def _plain_array(values: ndarray, typed_arrays: bool) -> dict | list | ndarray:
+    """
+    Parameters:
+        values (ndarray): Array of values
+        typed_arrays (bool): Encode numeric arrays as typed arrays
+
+    Returns:
+        dict|list|ndarray: Typed array spec, list of labels or dates, or a numeric
+            array for the JSON engine to write as a list
+    """
+    if values.dtype.kind == "M":
+        return datetime_as_string(values).tolist()
+    elif values.dtype.kind in ("O", "U"):
+        return values.tolist()
+    elif typed_arrays:
+        return _typed_array(values)
+
+    return values
+
+
+def _plain(obj, typed_arrays: bool):
+    """
+    Rebuilds the containers of a figure property, converting each array so the JSON
+        engines can write it without a cleaning pass: labels and dates become lists,
+        and numeric arrays become typed arrays if typed_arrays is True.
+
+    Parameters:
+        obj (any): Figure property, as stored in the figure
+        typed_arrays (bool): Encode numeric arrays as typed arrays
+
+    Returns:
+        any: Property that can be passed to plotly.io.json.to_json_plotly
+    """
+    if isinstance(obj, dict):
+        result = {}
+        for key, value in obj.items():
+            if key in skipped_keys:
+                result[key] = value
+            elif isinstance(value, ndarray):
+                result[key] = _plain_array(value, typed_arrays)
+            else:
+                result[key] = _plain(value, typed_arrays)
+        return result
+    elif isinstance(obj, (list, tuple)):
+        return [_plain(value, typed_arrays) for value in obj]
+
+    return obj
+
+
+def _figure_json(fig: Figure, typed_arrays: bool = None, engine: str = None) -> str:
+    """
+    Serializes a figure to JSON. The validated properties of each trace, the layout
+        and each frame are read with their public to_plotly_json, and each array is
+        converted once, so the JSON engine writes it directly. Figure.to_json also
+        walks each value of each array to clean it, which this skips.
+
+    Parameters:
+        fig (Figure): Figure to serialize
+        typed_arrays (bool): If True, numeric arrays (e.g., the y-values and moving
+            ranges) are written as base64 typed arrays ({"dtype": "f8", "bdata": ...}),
+            which plotly.js 2.28 and later decode. If False, they are written as lists
+            of numbers for older versions of plotly.js. If None, they are written the
+            same way as Figure.to_json with the installed version of Plotly (typed
+            arrays from Plotly 6), and the JSON is identical to Figure.to_json.
+        engine (str): JSON engine, "json", "orjson" or "auto". If None, the default
+            engine of plotly.io.json.config is used.
+
+    Returns:
+        str: Figure JSON
+    """
+    typed_arrays = plotly_typed_arrays if typed_arrays is None else typed_arrays
+
+    data = []
+    for trace in fig.data:
+        trace = _plain(trace.to_plotly_json(), typed_arrays)
+        trace.pop("uid", None)
+        data.append(trace)
+
+    layout = _plain(fig.layout.to_plotly_json(), typed_arrays)
+    fig_dict = {"data": data, "layout": layout}
+    frames = [_plain(frame.to_plotly_json(), typed_arrays) for frame in fig.frames]
+    if frames:
+        fig_dict["frames"] = frames
+
+    return to_json_plotly(fig_dict, engine=engine)
@@ -1,7 +1,7 @@
 import plotly.graph_objects as go
-from pandas import DataFrame
+from pandas import DataFrame, Series
 from spc_plotly.utils import endpoints, rounded_value, rounding_multiple
-from numpy import array
+from numpy import array, ndarray
 
 
 def _limit_line_shape(
@@ -30,9 +30,9 @@ def _limit_line_shape(
 
 def _create_limit_lines(
     data: DataFrame,
-    y_xmr_func: float,
-    npl_upper: float,
-    npl_lower: float,
+    y_xmr_func: float | ndarray,
+    npl_upper: float | ndarray,
+    npl_lower: float | ndarray,
     mR: float,
     mR_upper: float,
     sloped: bool,
@@ -47,9 +47,12 @@ def _create_limit_lines(
 
     Parameters:
         data (DataFrame): All data
-        y_xmr_func (float|list): Upper moving range limit. If sloped is True, this is a list of tuples.
-        npl_upper (float|list): Upper process limit. If sloped is True, this is a list of tuples.
-        npl_lower (float|list): Lower process limit. If sloped is True, this is a list of tuples.
+        y_xmr_func (float|ndarray): Upper moving range limit.
+            If sloped is True, this is an array with a value per point.
+        npl_upper (float|ndarray): Upper process limit.
+            If sloped is True, this is an array with a value per point.
+        npl_lower (float|ndarray): Lower process limit.
+            If sloped is True, this is an array with a value per point.
         mR (float|list): Moving range mid-line.
         mr_Upper (float|list): Upper moving range limit.
         y_name (str): Y-axis title.
@@ -70,14 +73,8 @@ def _create_limit_lines(
         upper_endpoints = endpoints.get_line_endpoints(npl_upper, data)
         lower_endpoints = endpoints.get_line_endpoints(npl_lower, data)
 
-        npl_upper_mid = [
-            (mid[0], mid[1] + ((upper[1] - mid[1]) / 2))
-            for (upper, mid) in zip(npl_upper, y_xmr_func)
-        ]
-        npl_lower_mid = [
-            (mid[0], mid[1] - ((mid[1] - lower[1]) / 2))
-            for (lower, mid) in zip(npl_lower, y_xmr_func)
-        ]
+        npl_upper_mid = y_xmr_func + ((npl_upper - y_xmr_func) / 2)
+        npl_lower_mid = y_xmr_func - ((y_xmr_func - npl_lower) / 2)
 
         upper_mid_endpoints = endpoints.get_line_endpoints(npl_upper_mid, data)
         lower_mid_endpoints = endpoints.get_line_endpoints(npl_lower_mid, data)
@@ -88,19 +85,21 @@ def _create_limit_lines(
         second_half_idx = data.values[half_idx:].shape[0] // 2
         second_half_loc = (second_half_idx + half_idx) / data.shape[0]
 
-        value_range = npl_upper[len(npl_upper) - 1][1] - npl_lower[0][1]
+        value_range = npl_upper[-1] - npl_lower[0]
         multiple = rounding_multiple.rounding_multiple(value_range)
-        range_min = rounded_value.rounded_value(npl_lower[0][1], multiple)
-        range_max = rounded_value.rounded_value(
-            npl_upper[len(npl_upper) - 1][1], multiple, "up"
-        )
+        range_min = rounded_value.rounded_value(npl_lower[0], multiple)
+        range_max = rounded_value.rounded_value(npl_upper[-1], multiple, "up")
         sloped_vertical_lines = [
             {
                 "fillcolor": "gray",
                 "line": {"color": "gray", "dash": "dot", "width": 1},
                 "name": "limit sloped line",
                 "opacity": 1,
-                "path": f"M {first_half_loc} {npl_lower[first_half_idx][1]} L {first_half_loc} {npl_upper[first_half_idx][1]+((range_max-range_min)*.05)}",
+                "path": (
+                    f"M {first_half_loc} {npl_lower[first_half_idx]} "
+                    f"L {first_half_loc} "
+                    f"{npl_upper[first_half_idx]+((range_max-range_min)*.05)}"
+                ),
                 "type": "path",
                 "xref": "paper",
             },
@@ -109,7 +108,11 @@ def _create_limit_lines(
                 "line": {"color": "gray", "dash": "dot", "width": 1},
                 "name": "limit sloped line",
                 "opacity": 1,
-                "path": f"M {second_half_loc} {npl_upper[second_half_idx+half_idx][1]} L {second_half_loc} {npl_lower[second_half_idx+half_idx][1]-((range_max-range_min)*.05)}",
+                "path": (
+                    f"M {second_half_loc} {npl_upper[second_half_idx+half_idx]} "
+                    f"L {second_half_loc} "
+                    f"{npl_lower[second_half_idx+half_idx]-((range_max-range_min)*.05)}"
+                ),
                 "type": "path",
                 "xref": "paper",
             },
@@ -191,3 +194,177 @@ def _create_limit_lines(
         shapes.extend(sloped_vertical_lines)
 
     return shapes
+
+
+def _limit_line_traces(
+    fig: go.Figure,
+    x_Ser: Series,
+    y_xmr_func: ndarray,
+    npl_upper: ndarray,
+    npl_lower: ndarray,
+    mR: ndarray,
+    mR_upper: ndarray,
+    webgl: bool = False,
+    chart_line_color: str = "gray",
+    chart_limit_color: str = "red",
+    chart_midrange_color: str = "pink",
+    chart_line_type: str = "dashdot",
+    chart_midrange_line_type: str = "dot",
+) -> go.Figure:
+    """
+    Adds limit lines with a value per point (i.e., limits calculated over a window) as
+        line traces, since they can not be drawn as straight shapes. Traces are added
+        after the signal traces and are always shown.
+
+    Parameters:
+        fig (Figure): XmR chart figure object
+        x_Ser (Series): Series of x-values
+        y_xmr_func (ndarray): Natural process limit mid-line, one value per x-value
+        npl_upper (ndarray): Upper process limit, one value per x-value
+        npl_lower (ndarray): Lower process limit, one value per x-value
+        mR (ndarray): Moving range mid-line, one value per x-value
+        mR_upper (ndarray): Upper moving range limit, one value per x-value
+        webgl (bool): Use WebGL (Scattergl) traces instead of SVG (Scatter) traces
+        chart_line_color (str): Mid-line color
+        chart_limit_color (str): Limit line color
+        chart_midrange_color (str): Midrange line color (i.e., line between mid-line and limit line)
+        chart_line_type (str): Mid- & limit line type
+        chart_midrange_line_type (str): Midrange line type
+
+    Returns:
+        Figure: Passed in XmR chart figure object with a trace for each line
+    """
+    trace = go.Scattergl if webgl else go.Scatter
+
+    lines = [
+        # Individual Values Chart
+        (1, "Mid-line", y_xmr_func, chart_line_color, chart_line_type),
+        (1, "Upper Limit", npl_upper, chart_limit_color, chart_line_type),
+        (1, "Lower Limit", npl_lower, chart_limit_color, chart_line_type),
+        (
+            1,
+            "Upper Mid-Range",
+            y_xmr_func + ((npl_upper - y_xmr_func) / 2),
+            chart_midrange_color,
+            chart_midrange_line_type,
+        ),
+        (
+            1,
+            "Lower Mid-Range",
+            y_xmr_func - ((y_xmr_func - npl_lower) / 2),
+            chart_midrange_color,
+            chart_midrange_line_type,
+        ),
+        # Moving Range Chart
+        (2, "mR Mid-line", mR, chart_line_color, chart_line_type),
+        (2, "mR Upper Limit", mR_upper, chart_limit_color, chart_line_type),
+        (
+            2,
+            "mR Upper Mid-Range",
+            mR + ((mR_upper - mR) / 2),
+            chart_midrange_color,
+            chart_midrange_line_type,
+        ),
+    ]
+
+    for row, name, values, line_color, line_type in lines:
+        fig.add_trace(
+            trace(
+                x=x_Ser,
+                y=values,
+                name=name,
+                mode="lines",
+                line=dict(color=line_color, dash=line_type),
+                hoverinfo="skip",
+            ),
+            row=row,
+            col=1,
+        )
+
+    return fig
+
+
+def _phase_limit_lines(
+    x_starts: list,
+    x_ends: list,
+    y_xmr_func: ndarray,
+    npl_upper: ndarray,
+    npl_lower: ndarray,
+    mR: ndarray,
+    mR_upper: ndarray,
+    chart_line_color: str = "gray",
+    chart_limit_color: str = "red",
+    chart_midrange_color: str = "pink",
+    chart_line_type: str = "dashdot",
+    chart_midrange_line_type: str = "dot",
+) -> list:
+    """
+    Create stepped limit lines for X-chart and mR-Chart, with one segment per phase and
+        a vertical line where each new phase starts
+
+    Parameters:
+        x_starts (list): x-value at which each phase starts
+        x_ends (list): x-value at which each phase ends (i.e., the start of the next)
+        y_xmr_func (ndarray): Natural process limit mid-line of each phase
+        npl_upper (ndarray): Upper process limit of each phase
+        npl_lower (ndarray): Lower process limit of each phase
+        mR (ndarray): Moving range mid-line of each phase
+        mR_upper (ndarray): Upper moving range limit of each phase
+        chart_line_color (str): Mid-line color
+        chart_limit_color (str): Limit line color
+        chart_midrange_color (str): Midrange line color (i.e., line between mid-line and limit line)
+        chart_line_type (str): Mid- & limit line type
+        chart_midrange_line_type (str): Midrange line type
+
+    Returns:
+        list[go.layout.Shape]: List of shape objects representing all XmR chart lines
+    """
+    upper_midrange = y_xmr_func + ((npl_upper - y_xmr_func) / 2)
+    lower_midrange = y_xmr_func - ((y_xmr_func - npl_lower) / 2)
+    mR_upper_midrange = mR + ((mR_upper - mR) / 2)
+
+    lines = [
+        # Individual Values Chart
+        ("x", "y", y_xmr_func, chart_line_color, chart_line_type),
+        ("x", "y", npl_upper, chart_limit_color, chart_line_type),
+        ("x", "y", npl_lower, chart_limit_color, chart_line_type),
+        ("x", "y", upper_midrange, chart_midrange_color, chart_midrange_line_type),
+        ("x", "y", lower_midrange, chart_midrange_color, chart_midrange_line_type),
+        # Moving Range Chart
+        ("x2", "y2", mR, chart_line_color, chart_line_type),
+        ("x2", "y2", mR_upper, chart_limit_color, chart_line_type),
+        ("x2", "y2", mR_upper_midrange, chart_midrange_color, chart_midrange_line_type),
+    ]
+
+    shapes = [
+        _limit_line_shape(
+            line_color=line_color,
+            line_type=line_type,
+            y0=values[i],
+            y1=values[i],
+            yref=yref,
+            x0=x_starts[i],
+            x1=x_ends[i],
+            xref=xref,
+        )
+        for xref, yref, values, line_color, line_type in lines
+        for i in range(len(x_starts))
+    ]
+
+    # Phase boundaries
+    shapes.extend(
+        _limit_line_shape(
+            line_color="gray",
+            line_type="dot",
+            y0=0,
+            y1=1,
+            yref=f"{yref} domain",
+            x0=x,
+            x1=x,
+            xref=xref,
+        )
+        for xref, yref in [("x", "y"), ("x2", "y2")]
+        for x in x_starts[1:]
+    )
+
+    return shapes
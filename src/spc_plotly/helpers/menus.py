@@ -1,26 +1,24 @@
 from plotly.graph_objects import Figure
 
 
-def _menu(
-    fig: Figure,
-    limit_lines: list,
-    limit_line_annotations: list,
-    long_run_shapes: list,
-    short_run_shapes: list,
-) -> Figure:
+def _menu(fig: Figure) -> Figure:
     """
-    Creates menu on figure for user to show anomalous points, long runs, or short runs
+    Creates menu on figure for user to show anomalous points, long runs, or short runs.
+        Limit lines and annotations are part of the layout and always shown, and each
+        button only toggles the visibility of the signal traces, so no shapes are
+        repeated in the menu.
 
     Parameters:
-        fig (Figure): XmR Chart figure object to be updated
-        limit_lines (list): List of dictionaries representing limit line shapes, specifically "lines".
-        limit_line_annotations (list): List of dictionaries representing chart annotations.
-        long_run_shapes (list): List of dictionaries representing "path" shapes for long runs.
-        short_run_shapes (list): List of dictionaries representing "path" shapes for short runs.
+        fig (Figure): XmR Chart figure object to be updated. Traces are expected in the
+            order: values, moving ranges, anomalies, moving range anomalies, long runs,
+            short runs. Any further traces (e.g., limit lines calculated over a window)
+            are always shown.
 
     Returns:
         Figure: Passed in XmR chart figure object updated to include menu for selecting anomalous point, long runs, or short runs
     """
+    always_shown = [True] * (len(fig.data) - 6)
+
     return fig.update_layout(
         updatemenus=[
             dict(
@@ -34,58 +32,51 @@ def _menu(
                     [
                         dict(
                             label="None",
-                            method="update",
+                            method="restyle",
                             args=[
-                                {"visible": [True, True, False, False]},
                                 {
-                                    "shapes": limit_lines,
-                                    "annotations": limit_line_annotations,
+                                    "visible": [True, True, False, False, False, False]
+                                    + always_shown
                                 },
                             ],
                         ),
                         dict(
                             label="Anomalies",
-                            method="update",
+                            method="restyle",
                             args=[
-                                {"visible": [True, True, True, True]},
                                 {
-                                    "shapes": limit_lines,
-                                    "annotations": limit_line_annotations,
+                                    "visible": [True, True, True, True, False, False]
+                                    + always_shown
                                 },
                             ],
                         ),
                         dict(
                             label="Long Runs",
-                            method="update",
+                            method="restyle",
                             args=[
-                                {"visible": [True, True, False, False]},
                                 {
-                                    "shapes": limit_lines + long_run_shapes,
-                                    "annotations": limit_line_annotations,
+                                    "visible": [True, True, False, False, True, False]
+                                    + always_shown
                                 },
                             ],
                         ),
                         dict(
                             label="Short Runs",
-                            method="update",
+                            method="restyle",
                             args=[
-                                {"visible": [True, True, False, False]},
                                 {
-                                    "shapes": limit_lines + short_run_shapes,
-                                    "annotations": limit_line_annotations,
+                                    "visible": [True, True, False, False, False, True]
+                                    + always_shown
                                 },
                             ],
                         ),
                         dict(
                             label="All",
-                            method="update",
+                            method="restyle",
                             args=[
-                                {"visible": [True, True, True, True]},
                                 {
-                                    "shapes": limit_lines
-                                    + long_run_shapes
-                                    + short_run_shapes,
-                                    "annotations": limit_line_annotations,
+                                    "visible": [True, True, True, True, True, True]
+                                    + always_shown
                                 },
                             ],
                         ),
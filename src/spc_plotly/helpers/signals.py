@@ -1,57 +1,271 @@
-from plotly.graph_objects import Figure, Scatter
-from math import ceil
-from numpy import sum as numpy_sum, array
-from spc_plotly.utils import combine_paths
+from typing import TYPE_CHECKING
+from numpy import (
+    arange,
+    argsort,
+    array,
+    concatenate,
+    cumsum,
+    flatnonzero,
+    full,
+    int64,
+    maximum,
+    nan,
+    ndarray,
+)
+
+if TYPE_CHECKING:
+    from plotly.graph_objects import Figure, Scatter, Scattergl
+
+
+def _trailing_counts(test: ndarray, window: int, first: ndarray = None) -> tuple:
+    """
+    Counts the True values in the trailing window ending at each point, in a single
+        vectorized pass over the prefix sums of the test array.
 
+    Parameters:
+        test (ndarray): Boolean array
+        window (int): Number of points in the trailing window. Windows at the start of
+            the array are truncated.
+        first (ndarray): Optional index of the first point of the series each point
+            belongs to, when several series are stacked in one array. Windows are
+            truncated so they never cross into the previous series.
 
-def _anomalies(
-    fig: Figure,
-    npl_upper: float | list,
-    npl_lower: float | list,
-    mR_upper: float,
-    sloped: bool,
+    Returns:
+        tuple: A tuple containing the following;
+            - ndarray: Index of the first point in each trailing window
+            - ndarray: Number of True values in each trailing window
+    """
+    prefix_sums = concatenate(([0], cumsum(test, dtype=int64)))
+    stops = arange(1, test.shape[0] + 1)
+    starts = maximum(stops - window, 0 if first is None else first)
+
+    return starts, prefix_sums[stops] - prefix_sums[starts]
+
+
+def _outside_limits(
+    y: ndarray,
+    npl_upper: float | ndarray,
+    npl_lower: float | ndarray,
 ) -> tuple:
     """
     Identifies all points that lie outside of the natural process limits
 
     Parameters:
-        fig (Figure): Passed in Figure object
-        npl_upper (float|list): Upper process limit. If sloped is True, this is a list of tuples.
-        npl_lower (float|list): Lower process limit. If sloped is True, this is a list of tuples.
-        mR_upper (float): Upper moving range limit.
-        sloped (bool): Use sloping approach for limit values.
+        y (ndarray): Array of y-values
+        npl_upper (float|ndarray): Upper process limit. If sloped, this is an array
+            with one value per point.
+        npl_lower (float|ndarray): Lower process limit. If sloped, this is an array
+            with one value per point.
+
+    Returns:
+        tuple: A tuple containing the following, in the same form as runs;
+            - ndarray: Index of each point outside of the limits
+            - ndarray: Index after each point outside of the limits
+            - ndarray: True if the point is above the upper limit, False if below the
+                lower
+    """
+    high = y >= npl_upper
+    idx = flatnonzero(high | (y <= npl_lower))
+
+    return idx, idx + 1, high[idx]
+
+
+def _anomaly_points(x: ndarray, y: ndarray, anomalies: tuple) -> list:
+    """
+    Builds the points that lie outside of the natural process limits
+
+    Parameters:
+        x (ndarray): Array of x-values
+        y (ndarray): Array of y-values
+        anomalies (tuple): Anomalies, as returned by _outside_limits
 
     Returns:
-        Figure: Passed in Figure object with added traces for anomalous points
         list[tuple]: All points that lie outside of the limits -> (x-value, y-value, "High"|"Low")
     """
-    # Detect point outside of natural limits
+    idx, _, high = anomalies
 
-    fig_data = fig.data
+    return [(x[i], y[i], "High" if h else "Low") for i, h in zip(idx, high)]
 
-    if sloped:
-        anomaly_points_raw = [
-            (x, y, "High" if y >= upper[1] else None, "Low" if y <= lower[1] else None)
-            for x, y, upper, lower in zip(
-                fig_data[0].x, fig_data[0].y, npl_upper, npl_lower
-            )
-        ]
-        anomaly_points = [
-            (x, y, upper if upper is not None else lower)
-            for (x, y, upper, lower) in anomaly_points_raw
-            if not (upper is None and lower is None)
-        ]
-    else:
-        anomaly_points = [
-            (x, y, "High" if y >= npl_upper else "Low")
-            for x, y in zip(fig_data[0].x, fig_data[0].y)
-            if y >= npl_upper or y <= npl_lower
+
+def _mR_outside_limit(mR: ndarray, mR_upper: float | ndarray) -> ndarray:
+    """
+    Identifies all moving range values that lie above the upper moving range limit
+
+    Parameters:
+        mR (ndarray): Array of moving range values
+        mR_upper (float|ndarray): Upper moving range limit. If the limits are
+            calculated over a window, this is an array with one value per point.
+
+    Returns:
+        ndarray: Index of each moving range value above the limit
+    """
+    return flatnonzero(mR >= mR_upper)
+
+
+def _mR_anomaly_points(x: ndarray, mR: ndarray, idx: ndarray) -> list:
+    """
+    Builds the moving range values that lie above the upper moving range limit
+
+    Parameters:
+        x (ndarray): Array of x-values
+        mR (ndarray): Array of moving range values
+        idx (ndarray): Index of each value above the limit, as returned by
+            _mR_outside_limit
+
+    Returns:
+        list[tuple]: All points that lie above the limit -> (x-value, mR-value)
+    """
+    return [(x[i], mR[i]) for i in idx]
+
+
+def _short_run_windows(
+    y: ndarray,
+    npl_upper: float | ndarray,
+    npl_lower: float | ndarray,
+    y_xmr_func: float | ndarray,
+    first: ndarray = None,
+) -> tuple:
+    """
+    Identifies every trailing window of 4 points in which at least 3 points are closer
+        to a limit line than the mid line.
+
+    Parameters:
+        y (ndarray): Array of y-values
+        npl_upper (float|ndarray): Upper process limit. If sloped, this is an array
+            with one value per point.
+        npl_lower (float|ndarray): Lower process limit. If sloped, this is an array
+            with one value per point.
+        y_xmr_func (float|ndarray): Natural process limit mid-line. If sloped, this is
+            an array with one value per point.
+        first (ndarray): Optional index of the first point of the series each point
+            belongs to. See _trailing_counts.
+
+    Returns:
+        tuple: A tuple containing the following;
+            - ndarray: Index of the first point in each window
+            - ndarray: Index after the last point in each window
+            - ndarray: True if the window is above the mid line, False if below
+    """
+    upper_midrange = y_xmr_func + ((npl_upper - y_xmr_func) / 2)
+    lower_midrange = y_xmr_func - ((y_xmr_func - npl_lower) / 2)
+
+    starts, upper_counts = _trailing_counts(y > upper_midrange, 4, first)
+    _, lower_counts = _trailing_counts(y < lower_midrange, 4, first)
+
+    high = upper_counts >= 3
+    idx = flatnonzero(high | (lower_counts >= 3))
+
+    return starts[idx], idx + 1, high[idx]
+
+
+def _long_run_windows(
+    y: ndarray, y_xmr_func: float | ndarray, first: ndarray = None
+) -> tuple:
+    """
+    Identifies every trailing window of 8 consecutive points above or below the mid
+        line.
+
+    Parameters:
+        y (ndarray): Array of y-values
+        y_xmr_func (float|ndarray): Natural process limit mid-line. If sloped, this is
+            an array with one value per point.
+        first (ndarray): Optional index of the first point of the series each point
+            belongs to. See _trailing_counts.
+
+    Returns:
+        tuple: A tuple containing the following;
+            - ndarray: Index of the first point in each window
+            - ndarray: Index after the last point in each window
+            - ndarray: True if the window is above the mid line, False if below
+    """
+    starts, upper_counts = _trailing_counts(y > y_xmr_func, 8, first)
+    _, lower_counts = _trailing_counts(y < y_xmr_func, 8, first)
+
+    high = upper_counts >= 8
+    idx = flatnonzero(high | (lower_counts >= 8))
+
+    return starts[idx], idx + 1, high[idx]
+
+
+def _signal_events(rules: dict) -> tuple:
+    """
+    Combines the intervals of several rules into one set of events, sorted by their
+        first point. Events starting at the same point keep the order of the rules.
+
+    Parameters:
+        rules (dict): Intervals of each rule by rule name, as returned by
+            _outside_limits, or by merge_intervals for the run windows
+
+    Returns:
+        tuple: A tuple of arrays containing the following for each event;
+            - ndarray: Index of the first point
+            - ndarray: Index after the last point
+            - ndarray: True if the event is above the mid line
+            - ndarray: Rule name
+    """
+    starts = concatenate([intervals[0] for intervals in rules.values()])
+    stops = concatenate([intervals[1] for intervals in rules.values()])
+    is_high = concatenate([intervals[2] for intervals in rules.values()])
+    rule = concatenate(
+        [full(len(intervals[0]), name) for name, intervals in rules.items()]
+    )
+
+    order = argsort(starts, kind="stable")
+
+    return starts[order], stops[order], is_high[order], rule[order]
+
+
+def _run_paths(x: ndarray, y: ndarray, runs: tuple) -> list:
+    """
+    Builds the points of each run
+
+    Parameters:
+        x (ndarray): Array of x-values
+        y (ndarray): Array of y-values
+        runs (tuple): Runs, as returned by merge_intervals for the run windows
+
+    Returns:
+        list[list]: List of lists, each sublist is a path, containing a tuple that represents
+            each point in the run -> (x-value, y-value, "High"|"Low")
+    """
+    return [
+        [
+            (d, v, "High" if high else "Low")
+            for d, v in zip(x[start:stop], y[start:stop])
         ]
+        for start, stop, high in zip(*runs)
+    ]
 
+
+def _anomalies(
+    fig: "Figure",
+    anomaly_points: list,
+    mR_anomaly_points: list,
+    webgl: bool = False,
+) -> "Figure":
+    """
+    Adds traces highlighting all points that lie outside of the limits
+
+    Parameters:
+        fig (Figure): Passed in Figure object
+        anomaly_points (list[tuple]): Points that lie outside of the natural process
+            limits -> (x-value, y-value, "High"|"Low")
+        mR_anomaly_points (list[tuple]): Points that lie above the upper moving range
+            limit -> (x-value, mR-value)
+        webgl (bool): Use WebGL (Scattergl) traces instead of SVG (Scatter) traces
+
+    Returns:
+        Figure: Passed in Figure object with added traces for anomalous points
+    """
+    from plotly.graph_objects import Scatter, Scattergl
+
+    trace = Scattergl if webgl else Scatter
+
+    # Arrays rather than lists, so the values can be written as typed arrays
     fig.add_trace(
-        Scatter(
-            x=[x[0] for x in anomaly_points],
-            y=[x[1] for x in anomaly_points],
+        trace(
+            x=array([x[0] for x in anomaly_points], dtype=object),
+            y=array([x[1] for x in anomaly_points], dtype=float),
             texttemplate="%{y}",
             mode="markers",
             marker=dict(size=8, color="red", symbol="cross"),
@@ -61,14 +275,10 @@ def _anomalies(
         col=1,
     )
 
-    mR_anomaly_points = [
-        (x, y) for x, y in zip(fig_data[1].x, fig_data[1].y) if y >= mR_upper
-    ]
-
     fig.add_trace(
-        Scatter(
-            x=[x[0] for x in mR_anomaly_points],
-            y=[x[1] for x in mR_anomaly_points],
+        trace(
+            x=array([x[0] for x in mR_anomaly_points], dtype=object),
+            y=array([x[1] for x in mR_anomaly_points], dtype=float),
             mode="markers",
             marker=dict(size=8, color="red", symbol="cross"),
             visible=False,
@@ -77,32 +287,87 @@ def _anomalies(
         col=1,
     )
 
-    return fig, anomaly_points
+    return fig
+
+
+def _run_trace(
+    paths: list,
+    shape_buffer: float,
+    name: str,
+    fill_color: str,
+    line_color: str,
+    line_width: int,
+    line_type: str,
+    opacity: float,
+    webgl: bool = False,
+) -> "Scatter | Scattergl":
+    """
+    Builds a single filled trace that highlights the area of the chart containing each
+        run. Each run is drawn as a closed polygon, and polygons are separated by gaps,
+        so the runs can be shown or hidden together by toggling the visibility of one
+        trace.
+
+    Parameters:
+        paths (list[list]): List of lists, each sublist is a path, containing a tuple
+            that represents each point in the run.
+        shape_buffer (float): Distance above and below each point to draw the shape
+        name (str): Name of trace
+        fill_color (str): Fill color of shape
+        line_color (str): Line color of shape
+        line_width (int): Line width of shape border
+        line_type (str): Line type of shape border
+        opacity (float): Opacity of shape fill
+        webgl (bool): Use WebGL (Scattergl) trace instead of SVG (Scatter) trace
+
+    Returns:
+        Scatter|Scattergl: Filled trace outlining every run, hidden until selected in
+            the menu
+    """
+    x, y = [], []
+    for path in paths:
+        x += [el[0] for el in path] + [el[0] for el in path[::-1]] + [path[0][0], None]
+        y += (
+            [el[1] + shape_buffer for el in path]
+            + [el[1] - shape_buffer for el in path[::-1]]
+            + [path[0][1] + shape_buffer, nan]
+        )
+
+    from plotly.graph_objects import Scatter, Scattergl
+
+    trace = Scattergl if webgl else Scatter
+
+    return trace(
+        x=array(x, dtype=object),
+        y=array(y, dtype=float),
+        name=name,
+        mode="lines",
+        fill="toself",
+        fillcolor=fill_color,
+        line=dict(color=line_color, dash=line_type, width=line_width),
+        opacity=opacity,
+        hoverinfo="skip",
+        visible=False,
+    )
 
 
 def _short_run_test(
-    fig: Figure,
-    npl_upper: float | list,
-    npl_lower: float | list,
-    y_xmr_func: float | list,
-    sloped: bool,
+    fig: "Figure",
+    short_runs: list,
     fill_color: str = "purple",
     line_color: str = "blue",
     line_width: int = 2,
     line_type: str = "longdashdot",
     opacity: float = 0.2,
     shape_buffer_pct: float = 0.05,
-) -> tuple:
+    webgl: bool = False,
+) -> "Figure":
     """
-    Identifies "short runs", defined as 3 out of 4 consecutive points closer to a limit
-        line than the mid line.
+    Adds a trace highlighting "short runs", defined as 3 out of 4 consecutive points
+        closer to a limit line than the mid line.
 
     Parameters:
         fig (Figure): Passed in Figure object
-        npl_upper (float|list): Upper process limit. If sloped is True, this is a list of tuples.
-        npl_lower (float|list): Lower process limit. If sloped is True, this is a list of tuples.
-        y_xmr_func (float|list): Upper moving range limit. If sloped is True, this is a list of tuples.
-        sloped (bool): Use sloping approach for limit values.
+        short_runs (list[list]): Points of each short run, as returned by _run_paths
         fill_color (str): Fill color of shape
         line_color (str): Line color of shape
         line_width (int): Line width of shape border
@@ -111,155 +376,51 @@ def _short_run_test(
         shape_buffer_pct (float): % buffer to use for shape build. For example:
             If y-value = 100, a shape buffer of 5% would mean the lower and upper values
             of the shape for that y-value are [95, 105].
+        webgl (bool): Use WebGL (Scattergl) trace instead of SVG (Scatter) trace
 
     Returns:
-        list[dict]: List of dictionaries that represent a shape for each short run that will
-            highlight the area of the chart containing the short run.
-        list[list]: List of lists, each sublist is a path, containing a tuple that represents
-            each point in the long run.
+        Figure: Passed in Figure object with added trace for short runs
     """
-    # Detect 8 consecutive points on one side of center line
-    fig_data = fig.data
-    dates = [el for el in fig_data[0].x]
-    results = fig_data[0].y
-    short_runs = []
     y_range = fig.layout.yaxis.range
+    shape_buffer = (y_range[1] - y_range[0]) * shape_buffer_pct
 
-    if sloped:
-        upper_midrange = [
-            (mid[0], mid[1] + ((upper[1] - mid[1]) / 2))
-            for (upper, mid) in zip(npl_upper, y_xmr_func)
-        ]
-        lower_midrange = [
-            (mid[0], mid[1] - ((mid[1] - lower[1]) / 2))
-            for (lower, mid) in zip(npl_lower, y_xmr_func)
-        ]
-        run_test_upper = results > [el[1] for el in upper_midrange]
-        run_test_lower = results < [el[1] for el in lower_midrange]
-
-        shape_buffer = (y_range[1] - y_range[0]) * shape_buffer_pct
-
-        for i, el in enumerate(results):
-            min_i = max(0, i - 3)
-            max_i = i + 1
-            trailing_sum_upper = numpy_sum(run_test_upper[min_i:max_i])
-            trailing_sum_lower = numpy_sum(run_test_lower[min_i:max_i])
-            if trailing_sum_upper >= 3:
-                short_runs.append(
-                    zip(
-                        dates[min_i:max_i],
-                        results[min_i:max_i],
-                        ["High"] * (max_i - min_i),
-                    )
-                )
-            elif trailing_sum_lower >= 3:
-                short_runs.append(
-                    zip(
-                        dates[min_i:max_i],
-                        results[min_i:max_i],
-                        ["Low"] * (max_i - min_i),
-                    )
-                )
-            else:
-                pass
-
-    else:
-        upper_midrange = y_xmr_func + ((npl_upper - y_xmr_func) / 2)
-        lower_midrange = y_xmr_func - ((y_xmr_func - npl_lower) / 2)
-        run_test_upper = results > upper_midrange
-        run_test_lower = results < lower_midrange
-
-        shape_buffer = (y_range[1] - y_range[0]) * shape_buffer_pct
-
-        for i, el in enumerate(results):
-            min_i = max(0, i - 3)
-            max_i = i + 1
-            trailing_sum_upper = numpy_sum(run_test_upper[min_i:max_i])
-            trailing_sum_lower = numpy_sum(run_test_lower[min_i:max_i])
-            if trailing_sum_upper >= 3:
-                short_runs.append(
-                    zip(
-                        dates[min_i:max_i],
-                        results[min_i:max_i],
-                        ["High"] * (max_i - min_i),
-                    )
-                )
-            elif trailing_sum_lower >= 3:
-                short_runs.append(
-                    zip(
-                        dates[min_i:max_i],
-                        results[min_i:max_i],
-                        ["Low"] * (max_i - min_i),
-                    )
-                )
-            else:
-                pass
-
-    paths = []
-    for run in short_runs:
-        path_build_list = []
-        for i, (d, v, t) in enumerate(run):
-            path_build_list.append((d, v, t))
-
-        paths.append(path_build_list)
-
-    # combine overlapping paths
-    c_paths = combine_paths.combine_paths(paths)
-
-    path_strings = []
-    for path in c_paths:
-        path_string = ""
-        for i, el in enumerate(path):
-            d = el[0]
-            v = el[1]
-            if i == 0:
-                path_string += "M {} {}".format(d, v + shape_buffer)
-            else:
-                path_string += " L {} {}".format(d, v + shape_buffer)
-
-        for el in path[::-1]:
-            d = el[0]
-            v = el[1]
-            path_string += " L {} {}".format(d, v - shape_buffer)
-
-        path_string += " Z"
-
-        path_strings.append(path_string)
-
-    shapes = []
-    for path_string in path_strings:
-        shapes.append(
-            {
-                "fillcolor": fill_color,
-                "line": {"color": line_color, "dash": line_type, "width": line_width},
-                "name": "Short Run",
-                "opacity": opacity,
-                "path": (path_string),
-                "type": "path",
-            }
-        )
+    fig.add_trace(
+        _run_trace(
+            short_runs,
+            shape_buffer=shape_buffer,
+            name="Short Run",
+            fill_color=fill_color,
+            line_color=line_color,
+            line_width=line_width,
+            line_type=line_type,
+            opacity=opacity,
+            webgl=webgl,
+        ),
+        row=1,
+        col=1,
+    )
 
-    return shapes, c_paths
+    return fig
 
 
 def _long_run_test(
-    fig: Figure,
-    y_xmr_func,
-    sloped: bool,
+    fig: "Figure",
+    long_runs: list,
     fill_color: str = "pink",
     line_color: str = "purple",
     line_width: int = 2,
     line_type: str = "longdashdot",
     opacity: float = 0.2,
     shape_buffer_pct: float = 0.05,
-) -> tuple:
+    webgl: bool = False,
+) -> "Figure":
     """
-    Identifies "long runs", defined as 8 consecutive points above or below the mid line.
+    Adds a trace highlighting "long runs", defined as 8 consecutive points above or
+        below the mid line.
 
     Parameters:
         fig (Figure): Passed in Figure object
-        y_xmr_func (float|list): Upper moving range limit. If sloped is True, this is a list of tuples.
-        sloped (bool): Use sloping approach for limit values.
+        long_runs (list[list]): Points of each long run, as returned by _run_paths
         fill_color (str): Fill color of shape
         line_color (str): Line color of shape
         line_width (int): Line width of shape border
@@ -268,96 +429,28 @@ def _long_run_test(
         shape_buffer_pct (float): % buffer to use for shape build. For example:
             If y-value = 100, a shape buffer of 5% would mean the lower and upper values
             of the shape for that y-value are [95, 105].
+        webgl (bool): Use WebGL (Scattergl) trace instead of SVG (Scatter) trace
 
     Returns:
-        list[dict]: List of dictionaries that represent a shape for each long run that will
-            highlight the area of the chart containing the long run.
-        list[list]: List of lists, each sublist is a path, containing a tuple that represents
-            each point in the long run.
+        Figure: Passed in Figure object with added trace for long runs
     """
-    fig_data = fig.data
-    dates = [el for el in fig_data[0].x]
-    results = fig_data[0].y
-
-    long_runs = []
     y_range = fig.layout.yaxis.range
     shape_buffer = (y_range[1] - y_range[0]) * shape_buffer_pct
 
-    if sloped:
-        y_func_values = [el[1] for el in y_xmr_func]
-        run_test_upper = results > array(y_func_values)
-        run_test_lower = results < array(y_func_values)
-
-        for i, el in enumerate(results):
-            trailing_sum_upper = numpy_sum(run_test_upper[max(0, i - 7) : i + 1])
-            trailing_sum_lower = numpy_sum(run_test_lower[max(0, i - 7) : i + 1])
-            if trailing_sum_upper >= 8 or trailing_sum_lower >= 8:
-                long_runs.append(
-                    zip(dates[max(0, i - 7) : i + 1], results[max(0, i - 7) : i + 1])
-                )
-
-        paths = []
-        for run in long_runs:
-            path_build_list = []
-            for i, (d, v) in enumerate(run):
-                y_value = [el[1] for el in y_xmr_func if el[0] == d]
-                path_build_list.append((d, v, "High" if v >= y_value else "Low"))
-
-            paths.append(path_build_list)
-    else:
-        run_test_upper = results > y_xmr_func
-        run_test_lower = results < y_xmr_func
-
-        for i, el in enumerate(results):
-            trailing_sum_upper = numpy_sum(run_test_upper[max(0, i - 7) : i + 1])
-            trailing_sum_lower = numpy_sum(run_test_lower[max(0, i - 7) : i + 1])
-            if trailing_sum_upper >= 8 or trailing_sum_lower >= 8:
-                long_runs.append(
-                    zip(dates[max(0, i - 7) : i + 1], results[max(0, i - 7) : i + 1])
-                )
-
-        paths = []
-        for run in long_runs:
-            path_build_list = []
-            for i, (d, v) in enumerate(run):
-                path_build_list.append((d, v, "High" if v >= y_xmr_func else "Low"))
-
-            paths.append(path_build_list)
-
-    # combine overlapping paths
-    c_paths = combine_paths.combine_paths(paths)
-
-    path_strings = []
-    for path in c_paths:
-        path_string = ""
-        for i, el in enumerate(path):
-            d = el[0]
-            v = el[1]
-            if i == 0:
-                path_string += "M {} {}".format(d, v + shape_buffer)
-            else:
-                path_string += " L {} {}".format(d, v + shape_buffer)
-
-        for el in path[::-1]:
-            d = el[0]
-            v = el[1]
-            path_string += " L {} {}".format(d, v - shape_buffer)
-
-        path_string += " Z"
-
-        path_strings.append(path_string)
-
-    shapes = []
-    for path_string in path_strings:
-        shapes.append(
-            {
-                "fillcolor": fill_color,
-                "line": {"color": line_color, "dash": line_type, "width": line_width},
-                "name": "Long Run",
-                "opacity": opacity,
-                "path": (path_string),
-                "type": "path",
-            }
-        )
+    fig.add_trace(
+        _run_trace(
+            long_runs,
+            shape_buffer=shape_buffer,
+            name="Long Run",
+            fill_color=fill_color,
+            line_color=line_color,
+            line_width=line_width,
+            line_type=line_type,
+            opacity=opacity,
+            webgl=webgl,
+        ),
+        row=1,
+        col=1,
+    )
 
-    return shapes, c_paths
+    return fig
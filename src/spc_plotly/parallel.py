@@ -0,0 +1,102 @@
+from concurrent.futures import ProcessPoolExecutor
+from pandas import DataFrame
+from numpy import asarray
+from spc_plotly.xmr import XmR
+
+
+def _build_chart(task: tuple) -> dict:
+    """
+    Builds one XmR chart inside a worker process. Errors are returned instead of raised
+        so that one bad series does not abort the other charts.
+
+    Parameters:
+        task (tuple): x-values, y-values, title, XmR keyword arguments, whether to
+            serialize the figure to JSON and whether to write typed arrays
+
+    Returns:
+        dict: A dictionary containing the following:
+            - str|Figure|None: XmR chart, as JSON if to_json is True
+            - dict|None: Moving range limit values
+            - dict|None: Natural process limit values
+            - dict|None: Signals
+            - str|None: Error message if the chart could not be built
+    """
+    x, y, title, xmr_kwargs, to_json, typed_arrays = task
+    x_ser_name = xmr_kwargs.pop("x_ser_name")
+    y_ser_name = xmr_kwargs.pop("y_ser_name")
+
+    try:
+        chart = XmR(
+            data=DataFrame({x_ser_name: x, y_ser_name: y}),
+            x_ser_name=x_ser_name,
+            y_ser_name=y_ser_name,
+            title=title,
+            **xmr_kwargs,
+        )
+
+        return {
+            "xmr_chart": (chart.to_json(typed_arrays) if to_json else chart.xmr_chart),
+            "mR_limit_values": chart.mR_limit_values,
+            "npl_limit_values": chart.npl_limit_values,
+            "signals": chart.signals,
+            "error": None,
+        }
+    except Exception as e:
+        return {
+            "xmr_chart": None,
+            "mR_limit_values": None,
+            "npl_limit_values": None,
+            "signals": None,
+            "error": f"{type(e).__name__}: {e}",
+        }
+
+
+def build_charts(
+    series: list,
+    titles: list = None,
+    x_ser_name: str = "x",
+    y_ser_name: str = "y",
+    workers: int = None,
+    chunksize: int = 1,
+    to_json: bool = True,
+    typed_arrays: bool = None,
+    **xmr_kwargs,
+) -> list:
+    """
+    Builds many XmR charts in parallel across a pool of worker processes. Only the x-
+        and y-values of each series are sent to the workers.
+
+    Parameters:
+        series (list[tuple]): (x-values, y-values) of each chart
+        titles (list[str]): Optional custom title of each chart
+        x_ser_name (str): Name of the x-values, shown on the charts
+        y_ser_name (str): Name of the y-values, shown on the charts
+        workers (int): Number of worker processes. If None, the number of CPUs is used.
+        chunksize (int): Number of series sent to a worker at a time. Larger chunks
+            reduce overhead when there are many small series.
+        to_json (bool): Serialize each figure to JSON inside the worker
+        typed_arrays (bool): If to_json, how numeric arrays are written. See
+            XmR.to_json.
+        **xmr_kwargs: Any other XmR parameter (e.g., x_cutoff, sloped, xmr_function),
+            applied to every chart. A DiskCache passed as cache is shared by the
+            workers, and a cached figure is returned without building it.
+
+    Returns:
+        list[dict]: One dictionary per series, in the same order as series. See
+            _build_chart for its contents.
+    """
+    titles = [None] * len(series) if titles is None else titles
+    if len(titles) != len(series):
+        e = f"Expected {len(series)} titles, got {len(titles)}"
+        raise ValueError(e)
+
+    xmr_kwargs["x_ser_name"] = x_ser_name
+    xmr_kwargs["y_ser_name"] = y_ser_name
+
+    tasks = [
+        (asarray(x), asarray(y), title, dict(xmr_kwargs), to_json, typed_arrays)
+        for (x, y), title in zip(series, titles)
+    ]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_build_chart, tasks, chunksize=chunksize))
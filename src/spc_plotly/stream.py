@@ -0,0 +1,347 @@
+from collections import deque
+from spc_plotly.utils import running_mean, running_median
+from spc_plotly.xmr import XmR_constants, XmRStats
+from spc_plotly import validation
+
+
+class XmRStream:
+    """
+    A class representing an XmR chart that is updated one point at a time. Each
+    appended point updates the moving range, the limits (while the point is part of the
+    baseline) and the state of the signal tests in constant time, and only the signals
+    triggered by the new point are returned.
+
+    Signals are evaluated against the limits known when the point is appended. Once a
+    point past x_cutoff is appended, the limits are frozen. If a window is set, the
+    limits are calculated from the most recent baseline points only.
+
+    Attributes:
+        x_begin: x-value before which points are excluded for purposes of
+            calculating limits. Must be comparable with the appended x-values. If None,
+            no points are excluded.
+        x_cutoff: x-value after which points are excluded for purposes of
+            calculating limits. Must be comparable with the appended x-values. If None,
+            the limits are never frozen.
+        xmr_function (str): Use "mean" or "median" function for calculating limit
+            values
+        window (int): Number of most recent baseline points used to calculate limits.
+            If None, all baseline points are used.
+        n_points (int): Number of points appended so far
+        frozen (bool): True once the baseline is past and limits no longer change
+        mR_limit_values (dict): Contains the moving range upper limit and mean/median
+            value
+        npl_limit_values (dict): Contains the natural process limits and mean/median
+            value
+    """
+
+    def __init__(
+        self,
+        x_begin=None,
+        x_cutoff=None,
+        xmr_function: str = "mean",
+        window: int = None,
+    ) -> None:
+        """
+        Initializes an XmR stream object.
+
+        Parameters:
+            x_begin: x-value before which points are excluded for purposes of
+                calculating limits. If None, no points are excluded.
+            x_cutoff: x-value after which points are excluded for purposes of
+                calculating limits. If None, the limits are updated with every point.
+            xmr_function (str): Use "mean" or "median" function for calculating limit
+                values
+            window (int): Number of most recent baseline points used to calculate
+                limits. If None, all baseline points are used.
+        """
+        validation.validate_xmr_func_val(xmr_function)
+        if window is not None and window < 2:
+            e = "window must be at least 2 points"
+            raise ValueError(e)
+
+        self.x_begin = x_begin
+        self.x_cutoff = x_cutoff
+        self.xmr_function = xmr_function.lower()
+        self.window = window
+        self.mR_Upper_Constant = XmR_constants.get(self.xmr_function).get("mR_Upper")
+        self.npl_Constant = XmR_constants.get(self.xmr_function).get("npl_Constant")
+
+        self.n_points = 0
+        self.frozen = False
+        self.mR_limit_values = None
+        self.npl_limit_values = None
+
+        # Baseline values
+        baseline_func = (
+            running_mean.RunningMean
+            if self.xmr_function == "mean"
+            else running_median.RunningMedian
+        )
+        self._baseline_y = baseline_func()
+        self._baseline_mR = baseline_func()
+        self._window_y = deque()
+        self._window_mR = deque()
+        self._last_in_baseline = False
+
+        # Signal test state
+        self._last_y = None
+        self._last_x = deque(maxlen=4)
+        self._run_above = 0
+        self._run_below = 0
+        self._run_start_x = None
+        self._short_run_upper = deque(maxlen=4)
+        self._short_run_lower = deque(maxlen=4)
+        # Index of the last point ending a window of 4 that is part of a short run
+        self._short_run_last = {"High": None, "Low": None}
+
+    @classmethod
+    def from_xmr(cls, xmr: XmRStats) -> "XmRStream":
+        """
+        Creates a stream that continues an existing XmR chart. The limits of the chart
+            are frozen and its points are replayed to set up the signal test state. If
+            the chart's limits are calculated over a window, the limits are not frozen
+            and are recalculated as the points are replayed. If the chart has phases,
+            the stream continues the phase of the last point: its limits are frozen
+            and only its points are replayed, as runs do not cross phases.
+
+        Parameters:
+            xmr (XmRStats): XmR chart or statistics object to continue
+
+        Returns:
+            XmRStream: Stream positioned after the last point of the chart
+        """
+        if xmr.sloped:
+            e = "Streaming is not supported for sloped limits"
+            raise ValueError(e)
+
+        if xmr.window is not None:
+            stream = cls(
+                x_begin=xmr.x_begin,
+                x_cutoff=xmr.x_cutoff,
+                xmr_function=xmr.xmr_function,
+                window=None if xmr.window == "expanding" else xmr.window,
+            )
+        else:
+            stream = cls(
+                x_begin=xmr.x_begin,
+                x_cutoff=xmr.x_cutoff,
+                xmr_function=xmr.xmr_function,
+            )
+            stream.frozen = True
+            if xmr.phase_limits is None:
+                stream.mR_limit_values = dict(xmr.mR_limit_values)
+                stream.npl_limit_values = dict(xmr.npl_limit_values)
+            else:
+                last_phase = xmr.phase_limits.iloc[int(xmr._phase[-1])]
+                stream.mR_limit_values = {
+                    key: float(last_phase[key])
+                    for key in ("mR_xmr_func", "mR_upper_limit")
+                }
+                stream.npl_limit_values = {
+                    key: float(last_phase[key])
+                    for key in ("y_xmr_func", "npl_upper_limit", "npl_lower_limit")
+                }
+                stream.mR_limit_values["xmr_func"] = xmr.xmr_function
+                stream.npl_limit_values["xmr_func"] = xmr.xmr_function
+
+        # Runs do not cross phases, so only the points of the last phase are replayed
+        start = 0 if xmr._phase_first is None else int(xmr._phase_first[-1])
+        stream.extend(xmr._x_Ser.to_numpy()[start:], xmr._y_Ser.to_numpy()[start:])
+
+        return stream
+
+    def _update_limits(self) -> None:
+        """
+        Recalculates the limits from the baseline values
+        """
+        if len(self._baseline_y) == 0 or len(self._baseline_mR) == 0:
+            return
+
+        mR_xmr_func = self._baseline_mR.value()
+        y_xmr_func = self._baseline_y.value()
+
+        self.mR_limit_values = {
+            "mR_xmr_func": mR_xmr_func,
+            "mR_upper_limit": mR_xmr_func * self.mR_Upper_Constant,
+            "xmr_func": self.xmr_function,
+        }
+        self.npl_limit_values = {
+            "y_xmr_func": y_xmr_func,
+            "npl_upper_limit": y_xmr_func + (self.npl_Constant * mR_xmr_func),
+            "npl_lower_limit": max(y_xmr_func - (self.npl_Constant * mR_xmr_func), 0),
+            "xmr_func": self.xmr_function,
+        }
+
+    def _update_baseline(self, x, y: float, mR: float) -> None:
+        """
+        Adds a point to the baseline if it lies between x_begin and x_cutoff
+
+        Parameters:
+            x: x-value of the point
+            y (float): y-value of the point
+            mR (float): Moving range of the point
+        """
+        if self.x_cutoff is not None and x > self.x_cutoff:
+            self.frozen = True
+            return
+
+        in_baseline = self.x_begin is None or x >= self.x_begin
+        if in_baseline:
+            self._baseline_y.add(y)
+            # A moving range is only part of the baseline if both of its points are
+            if self._last_in_baseline:
+                self._baseline_mR.add(mR)
+
+            # Values are only kept while they are in the window
+            if self.window is not None:
+                self._window_y.append(y)
+                if self._last_in_baseline:
+                    self._window_mR.append(mR)
+
+                # Drop values that slid out of the window
+                if len(self._window_y) > self.window:
+                    self._baseline_y.remove(self._window_y.popleft())
+                if len(self._window_mR) > self.window - 1:
+                    self._baseline_mR.remove(self._window_mR.popleft())
+
+            self._update_limits()
+
+        self._last_in_baseline = in_baseline
+
+    def _signal(self, rule: str, direction: str, n_points: int, start_x, x) -> dict:
+        """
+        Signal formatter
+
+        Parameters:
+            rule (str): "anomaly", "long_run" or "short_run"
+            direction (str): "High" or "Low"
+            n_points (int): Number of points in the signal, ending at the new point
+            start_x: x-value of the first point in the signal
+            x: x-value of the new point
+
+        Returns:
+            dict: Signal
+        """
+        return {
+            "rule": rule,
+            "direction": direction,
+            "start_idx": self.n_points - n_points + 1,
+            "end_idx": self.n_points,
+            "start_x": start_x,
+            "end_x": x,
+            "n_points": n_points,
+        }
+
+    def _test(self, x, y: float) -> list:
+        """
+        Updates the signal test state with a new point
+
+        Parameters:
+            x: x-value of the point
+            y (float): y-value of the point
+
+        Returns:
+            list[dict]: Signals triggered by the point
+        """
+        if self.npl_limit_values is None:
+            return []
+
+        y_xmr_func = self.npl_limit_values.get("y_xmr_func")
+        npl_upper = self.npl_limit_values.get("npl_upper_limit")
+        npl_lower = self.npl_limit_values.get("npl_lower_limit")
+        new_signals = []
+
+        # Anomalies
+        if y >= npl_upper:
+            new_signals.append(self._signal("anomaly", "High", 1, x, x))
+        elif y <= npl_lower:
+            new_signals.append(self._signal("anomaly", "Low", 1, x, x))
+
+        # Long runs: 8 or more consecutive points on one side of the mid line
+        if y > y_xmr_func:
+            self._run_start_x = x if self._run_above == 0 else self._run_start_x
+            self._run_above += 1
+            self._run_below = 0
+        elif y < y_xmr_func:
+            self._run_start_x = x if self._run_below == 0 else self._run_start_x
+            self._run_below += 1
+            self._run_above = 0
+        else:
+            self._run_above = 0
+            self._run_below = 0
+
+        # A run is only signalled on its 8th point, not again as it grows
+        if max(self._run_above, self._run_below) == 8:
+            direction = "High" if self._run_above == 8 else "Low"
+            new_signals.append(
+                self._signal("long_run", direction, 8, self._run_start_x, x)
+            )
+
+        # Short runs: 3 out of the last 4 points closer to a limit than the mid line
+        self._short_run_upper.append(y > y_xmr_func + ((npl_upper - y_xmr_func) / 2))
+        self._short_run_lower.append(y < y_xmr_func - ((y_xmr_func - npl_lower) / 2))
+        if sum(self._short_run_upper) >= 3:
+            direction = "High"
+        elif sum(self._short_run_lower) >= 3:
+            direction = "Low"
+        else:
+            direction = None
+
+        if direction is not None:
+            # Windows overlapping the last window of a short run extend that run, as
+            #   in merge_intervals, so only the first window of a run is signalled
+            last = self._short_run_last[direction]
+            if last is None or self.n_points - last > 3:
+                window = len(self._short_run_upper)
+                new_signals.append(
+                    self._signal(
+                        "short_run", direction, window, self._last_x[-window], x
+                    )
+                )
+            self._short_run_last[direction] = self.n_points
+
+        return new_signals
+
+    def append(self, x, y: float) -> list:
+        """
+        Appends a point to the chart
+
+        Parameters:
+            x: x-value of the point
+            y (float): y-value of the point
+
+        Returns:
+            list[dict]: Signals triggered by the point, each containing the rule
+                ("anomaly", "long_run" or "short_run"), direction ("High" or "Low"),
+                first and last index, first and last x-value, and number of points.
+                A run is returned once, on the point that completes it (its 8th point,
+                or the last point of its first window of 4), and not again as it grows.
+        """
+        mR = float("nan") if self._last_y is None else abs(y - self._last_y)
+        if not self.frozen:
+            self._update_baseline(x, y, mR)
+
+        self._last_x.append(x)
+        new_signals = self._test(x, y)
+
+        self._last_y = y
+        self.n_points += 1
+
+        return new_signals
+
+    def extend(self, xs, ys) -> list:
+        """
+        Appends several points to the chart
+
+        Parameters:
+            xs (array-like): x-values of the points
+            ys (array-like): y-values of the points
+
+        Returns:
+            list[dict]: Signals triggered by the points. See append.
+        """
+        new_signals = []
+        for x, y in zip(xs, ys):
+            new_signals.extend(self.append(x, y))
+
+        return new_signals
@@ -0,0 +1,105 @@
+from datetime import datetime
+from numpy import (
+    asarray,
+    datetime64,
+    ndarray,
+    ones,
+    searchsorted,
+)
+
+
+def _bound(value: str, date_format: str, unit: str, x_name: str) -> tuple:
+    """
+    Parses an x_begin/x_cutoff label into the time span it covers
+
+    Parameters:
+        value (str): Label, formatted with date_format
+        date_format (str): Format of the labels (e.g., "%Y-%m")
+        unit (str): NumPy datetime unit matching date_format (e.g., "M")
+        x_name (str): Name of the x-values, for error messages
+
+    Returns:
+        tuple: A tuple containing the following;
+            - datetime64: Start of the label, inclusive
+            - datetime64: End of the label, exclusive
+    """
+    try:
+        parsed = datetime.strptime(value, date_format)
+    except (TypeError, ValueError):
+        parsed = None
+
+    # Only labels that format back to themselves can match an x-value label
+    if parsed is None or parsed.strftime(date_format) != value:
+        e = f"{value} not present in {x_name}"
+        raise ValueError(e)
+
+    start = datetime64(parsed, unit)
+
+    return start.astype("datetime64[ns]"), (start + 1).astype("datetime64[ns]")
+
+
+def baseline_index(
+    x_dt,
+    x_begin: str,
+    x_cutoff: str,
+    date_format: str,
+    unit: str,
+    x_name: str = None,
+) -> slice | ndarray:
+    """
+    Locates the points between x_begin and x_cutoff without formatting the x-values.
+        A point is included if its label, formatted with date_format, lies between
+        x_begin and x_cutoff (inclusive). Since a label covers one unit of time, this is
+        the same as the datetime lying between the start of x_begin and the end of
+        x_cutoff. If the x-values are sorted, the bounds are found with a binary search
+        and a slice is returned. Otherwise, a boolean mask is returned.
+
+    Parameters:
+        x_dt (array-like): Series of x-values, datetime format
+        x_begin (str): Label before which points are excluded. If None, no points are
+            excluded.
+        x_cutoff (str): Label after which points are excluded. If None, no points are
+            excluded.
+        date_format (str): Format of the labels (e.g., "%Y-%m")
+        unit (str): NumPy datetime unit matching date_format (e.g., "M")
+        x_name (str): Name of the x-values, for error messages
+
+    Returns:
+        slice|ndarray: Slice of the points, or True for each point, between x_begin and
+            x_cutoff
+
+    Raises:
+        ValueError: If x_begin or x_cutoff does not match the label of any point
+    """
+    x = asarray(x_dt, dtype="datetime64[ns]")
+    n = x.shape[0]
+    begin = None if x_begin is None else _bound(x_begin, date_format, unit, x_name)
+    cutoff = None if x_cutoff is None else _bound(x_cutoff, date_format, unit, x_name)
+
+    if n < 2 or (x[1:] >= x[:-1]).all():
+        start = 0 if begin is None else int(searchsorted(x, begin[0]))
+        stop = n if cutoff is None else int(searchsorted(x, cutoff[1]))
+
+        if begin is not None and not (start < n and x[start] < begin[1]):
+            e = f"{x_begin} not present in {x_name}"
+            raise ValueError(e)
+        if cutoff is not None and not (stop > 0 and x[stop - 1] >= cutoff[0]):
+            e = f"{x_cutoff} not present in {x_name}"
+            raise ValueError(e)
+
+        return slice(start, stop)
+
+    if begin is not None and not ((x >= begin[0]) & (x < begin[1])).any():
+        e = f"{x_begin} not present in {x_name}"
+        raise ValueError(e)
+    if cutoff is not None and not ((x >= cutoff[0]) & (x < cutoff[1])).any():
+        e = f"{x_cutoff} not present in {x_name}"
+        raise ValueError(e)
+
+    mask = ones(n, dtype=bool)
+    if begin is not None:
+        mask &= x >= begin[0]
+    if cutoff is not None:
+        mask &= x < cutoff[1]
+
+    return mask
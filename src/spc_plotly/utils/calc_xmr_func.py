@@ -1,17 +1,20 @@
+from numpy import asarray, nanmean, nanmedian
+
+
 def calc_xmr_func(data, func="mean"):
     """
-    Calculate aggregate function
+    Calculate aggregate function. Missing values are ignored.
 
     Parameters:
-        data (Series): Series of values
+        data (Series|ndarray): Series or array of values
         func (str): Mean or median
 
     Returns:
         Float: Mean or median value of data
     """
     if func == "mean":
-        return data.mean()
+        return nanmean(asarray(data, dtype=float))
     elif func == "median":
-        return data.median()
+        return nanmedian(asarray(data, dtype=float))
     else:
         raise ValueError("Invalid function")
@@ -0,0 +1,146 @@
+from heapq import heappop, heappush
+from math import log
+from numpy import (
+    abs,
+    arange,
+    argmax,
+    asarray,
+    concatenate,
+    cumsum,
+    flatnonzero,
+    int64,
+    isnan,
+    ndarray,
+)
+from spc_plotly.helpers import signals
+
+# Same constants as XmR with the mean: the limits are the mean plus or minus
+#   npl_Constant times the average moving range, and sigma is the average moving
+#   range divided by d2 = 1.128
+npl_Constant = 2.660
+d2 = 1.128
+
+
+def _has_signal(values: ndarray, min_anomalies: int) -> bool:
+    """
+    Tests whether a segment is out of control against its own XmR limits, i.e., it
+        contains a long run or a cluster of points outside of the limits
+
+    Parameters:
+        values (ndarray): Values of the segment, without missing values
+        min_anomalies (int): Number of points outside of the limits that count as a
+            cluster
+
+    Returns:
+        bool: True if the segment contains a long run or a cluster of anomalies
+    """
+    y_xmr_func = values.mean()
+    mR_xmr_func = abs(values[1:] - values[:-1]).mean()
+    npl_upper = y_xmr_func + (npl_Constant * mR_xmr_func)
+    npl_lower = max(y_xmr_func - (npl_Constant * mR_xmr_func), 0)
+
+    if signals._long_run_windows(values, y_xmr_func)[0].shape[0] > 0:
+        return True
+
+    return signals._outside_limits(values, npl_upper, npl_lower)[0].shape[0] >= (
+        min_anomalies
+    )
+
+
+def _best_split(prefix_sums: ndarray, start: int, stop: int, min_size: int) -> tuple:
+    """
+    Finds the split of a segment that most reduces the sum of squared deviations from
+        the mean of each side, for every split position at once
+
+    Parameters:
+        prefix_sums (ndarray): Prefix sums of the values, starting with 0
+        start (int): Index of the first point of the segment
+        stop (int): Index after the last point of the segment
+        min_size (int): Fewest points on each side of the split
+
+    Returns:
+        tuple: A tuple containing the following;
+            - float: Reduction in the sum of squares
+            - int: Index of the first point after the split
+    """
+    k = arange(start + min_size, stop - min_size + 1, dtype=int64)
+    total = prefix_sums[stop] - prefix_sums[start]
+    left_sum = prefix_sums[k] - prefix_sums[start]
+    gain = (
+        (left_sum**2 / (k - start))
+        + ((total - left_sum) ** 2 / (stop - k))
+        - (total**2 / (stop - start))
+    )
+    best = argmax(gain)
+
+    return gain[best], int(k[best])
+
+
+def changepoints(
+    data,
+    min_size: int = 8,
+    penalty: float = None,
+    max_changepoints: int = None,
+    min_anomalies: int = 2,
+) -> ndarray:
+    """
+    Detects shifts in the level of a process with binary segmentation. The best split
+        of a segment is the one that most reduces the sum of squared deviations from
+        the mean of each side, found for every split position at once from prefix sums.
+        A split is only kept if the segment is out of control against its own XmR
+        limits (a long run or a cluster of anomalies), if the reduction is larger than
+        penalty times the process variance estimated from the average moving range, and
+        if both sides have at least min_size points. Each split only tests the two new
+        segments, so the cost is O(n log n) when the shifts split the series evenly and
+        O(n * k) for k shifts at worst (e.g., a shift every few points).
+
+    Parameters:
+        data (Series|ndarray): Series or array of values. Missing values are ignored.
+        min_size (int): Fewest points in a phase. Defaults to the length of a long run.
+        penalty (float): Reduction in the sum of squares, in units of the process
+            variance, that a split must exceed. If None, 2 * log(n) is used, so a single
+            shift must be about 3.7 standard errors for 1,000 points.
+        max_changepoints (int): Most changepoints to return. If set, the splits with the
+            largest reduction are kept first, which also bounds the cost.
+        min_anomalies (int): Number of points outside of a segment's limits that count
+            as a cluster of anomalies.
+
+    Returns:
+        ndarray: Sorted index of the first point of each new phase
+    """
+    values = asarray(data, dtype=float)
+    idx = flatnonzero(~isnan(values))
+    values = values[idx]
+    n = values.shape[0]
+    if n < 2 * min_size:
+        return idx[:0]
+
+    variance = (abs(values[1:] - values[:-1]).mean() / d2) ** 2
+    if not variance > 0:
+        return idx[:0]
+    threshold = (2 * log(n) if penalty is None else penalty) * variance
+
+    # Centering the values keeps the squared prefix sums precise
+    prefix_sums = concatenate(([0.0], cumsum(values - values.mean())))
+
+    # Segments that may be split, largest reduction first
+    candidates = []
+    splits = []
+    new_segments = [(0, n)]
+    while True:
+        for start, stop in new_segments:
+            if stop - start < 2 * min_size:
+                continue
+            gain, split = _best_split(prefix_sums, start, stop, min_size)
+            if gain > threshold and _has_signal(values[start:stop], min_anomalies):
+                heappush(candidates, (-gain, start, stop, split))
+
+        if not candidates or len(splits) == max_changepoints:
+            break
+        _, start, stop, split = heappop(candidates)
+        splits.append(split)
+        new_segments = [(start, split), (split, stop)]
+
+    splits.sort()
+
+    return idx[asarray(splits, dtype=int64)]
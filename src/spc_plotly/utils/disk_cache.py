@@ -0,0 +1,289 @@
+import os
+import pickle
+from hashlib import blake2b
+from importlib.metadata import PackageNotFoundError, version as package_version
+from tempfile import mkstemp
+from threading import Lock
+
+# Suffix of entry files. Temporary files use another suffix, so they are never read
+#   or evicted while being written.
+entry_suffix = ".pkl"
+
+# The directory is listed at most once every this many writes, unless the writes of
+#   this process alone take it over max_bytes
+rescan_interval = 100
+
+# Eviction deletes entries until the directory holds at most this share of max_bytes,
+#   so a full cache is not listed again on the next write
+low_water_mark = 0.9
+
+
+def _package_version(name: str) -> str:
+    """
+    Looks up the version of an installed package without importing it
+
+    Parameters:
+        name (str): Name of package distribution (e.g., "plotly")
+
+    Returns:
+        str: Installed version, or "unknown" if the package is not installed
+    """
+    try:
+        return package_version(name)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+class DiskCache:
+    """
+    Cache stored as one pickle file per entry in a directory, so it outlives the
+        process and can be shared by several worker processes. Entry files are keyed by
+        a hash of the key and the library version ("unknown" if spc-plotly is not
+        installed), so entries written by another version are never read. Writes go to
+        a temporary file that is then renamed over the entry file, so readers see either
+        the old or the new entry and never a partial one.
+
+    Each process keeps a running total of the bytes it has written since it last listed
+        the directory. The directory is listed on the first write, once the total
+        passes max_bytes, and every rescan_interval writes (to count the writes of
+        other processes). If it holds more than max_bytes, the least recently used
+        entries (by modification time, updated on every hit) are deleted until it holds
+        at most low_water_mark times max_bytes. With several writers, the directory can
+        briefly exceed max_bytes between listings.
+
+    Entries are read with pickle, so only use a directory that untrusted users can not
+        write to. Hits, misses and evictions are counted for this process only, and a
+        DiskCache sent to worker processes (e.g., in the xmr_kwargs of
+        parallel.build_charts) starts counting from zero.
+    """
+
+    def __init__(
+        self, directory: str, max_bytes: int = 2**28, version: str = None
+    ) -> None:
+        if (
+            isinstance(max_bytes, bool)
+            or not isinstance(max_bytes, int)
+            or max_bytes < 1
+        ):
+            raise ValueError("max_bytes must be a positive integer")
+
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        self.version = _package_version("spc-plotly") if version is None else version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = Lock()
+        # Bytes in the directory, as of the last listing plus this process's writes
+        self._bytes = None
+        self._puts_since_scan = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def __getstate__(self) -> dict:
+        # Sent to worker processes without the lock or this process's statistics
+        return {
+            "directory": self.directory,
+            "max_bytes": self.max_bytes,
+            "version": self.version,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(**state)
+
+    def _path(self, key: str) -> str:
+        """
+        Parameters:
+            key (str): Key of entry
+
+        Returns:
+            str: Path of the entry file
+        """
+        name = blake2b(f"{self.version}\0{key}".encode(), digest_size=16).hexdigest()
+        return os.path.join(self.directory, name + entry_suffix)
+
+    def _entries(self) -> list:
+        """
+        Returns:
+            list[tuple]: Modification time, size and path of each entry file. Files
+                removed by another process while listing are skipped.
+        """
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(entry_suffix):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        return entries
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def get(self, key: str, default=None):
+        """
+        Reads an entry and marks it as the most recently used. An entry that can not be
+            read (e.g., written by an incompatible version of a dependency) is deleted
+            and counted as a miss.
+
+        Parameters:
+            key (str): Key of entry
+            default (any): Returned if there is no entry for key
+
+        Returns:
+            any: Value of entry, or default
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            value = default
+            hit = False
+        except Exception:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            value = default
+            hit = False
+        else:
+            hit = True
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        return value
+
+    def put(self, key: str, value) -> None:
+        """
+        Writes an entry atomically, then evicts the least recently used entries if the
+            directory holds more than max_bytes
+
+        Parameters:
+            key (str): Key of entry
+            value (any): Value of entry, must be picklable
+        """
+        path = self._path(key)
+        try:
+            replaced_size = os.stat(path).st_size
+        except FileNotFoundError:
+            replaced_size = 0
+
+        fd, tmp_path = mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                size = f.tell()
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            self._puts_since_scan += 1
+            if self._bytes is not None:
+                self._bytes += size - replaced_size
+            scan = (
+                self._bytes is None
+                or self._bytes > self.max_bytes
+                or self._puts_since_scan >= rescan_interval
+            )
+        if scan:
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        Lists the directory and, if it holds more than max_bytes, deletes the least
+            recently used entries until it holds at most low_water_mark times max_bytes.
+            Entries deleted by another process at the same time are skipped.
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes:
+            entries.sort()
+            total = self._delete_oldest(entries, total)
+
+        with self._lock:
+            self._bytes = total
+            self._puts_since_scan = 0
+
+    def _delete_oldest(self, entries: list, total: int) -> int:
+        """
+        Deletes entries, oldest first, until the directory holds at most low_water_mark
+            times max_bytes
+
+        Parameters:
+            entries (list[tuple]): Modification time, size and path of each entry file,
+                oldest first
+            total (int): Bytes held by the entries
+
+        Returns:
+            int: Bytes held by the remaining entries
+        """
+        target = self.max_bytes * low_water_mark
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            else:
+                with self._lock:
+                    self.evictions += 1
+            total -= size
+
+        return total
+
+    def clear(self) -> None:
+        """
+        Deletes every entry and resets the statistics
+        """
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self._bytes = 0
+            self._puts_since_scan = 0
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Number of hits, misses and evictions in this process, the hit rate,
+                and the current number and total size of entries
+        """
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,27 @@
+from hashlib import blake2b
+from numpy import ascontiguousarray
+
+
+def fingerprint(arrays: list, params: dict) -> str:
+    """
+    Hashes arrays and parameters into a key identifying the input of a calculation.
+        Arrays are hashed from their raw bytes, along with their dtype and shape, so
+        the cost is a single pass over the data (about 1 GB/s) and no values are
+        formatted.
+
+    Parameters:
+        arrays (list[ndarray]): Arrays with a numeric or datetime dtype
+        params (dict): Parameters of the calculation. Values must have a stable repr
+            (e.g., strings, numbers, tuples or None).
+
+    Returns:
+        str: Hex digest of 32 characters
+    """
+    h = blake2b(digest_size=16)
+    for array in arrays:
+        array = ascontiguousarray(array)
+        h.update(f"{array.dtype.str}{array.shape}".encode())
+        h.update(array.view("uint8").data)
+    h.update(repr(sorted(params.items())).encode())
+
+    return h.hexdigest()
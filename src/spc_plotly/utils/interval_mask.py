@@ -0,0 +1,20 @@
+from numpy import add, asarray, cumsum, int64, zeros
+
+
+def interval_mask(starts, stops, n: int):
+    """
+    Flags every point covered by one or more [start, stop) index intervals
+
+    Parameters:
+        starts (array-like): Index of the first point in each interval
+        stops (array-like): Index after the last point in each interval
+        n (int): Number of points
+
+    Returns:
+        ndarray: True for each point inside an interval
+    """
+    counts = zeros(n + 1, dtype=int64)
+    add.at(counts, asarray(starts, dtype=int64), 1)
+    add.at(counts, asarray(stops, dtype=int64), -1)
+
+    return cumsum(counts[:-1]) > 0
@@ -0,0 +1,91 @@
+from collections import OrderedDict
+from threading import Lock
+
+
+class LRUCache:
+    """
+    Mapping with a bounded number of entries. When full, adding an entry evicts the
+        least recently used one. Lookups and insertions are O(1) and thread-safe, and
+        the number of hits, misses and evictions is recorded.
+    """
+
+    def __init__(self, max_size: int = 128) -> None:
+        if isinstance(max_size, bool) or not isinstance(max_size, int) or max_size < 1:
+            raise ValueError("max_size must be a positive integer")
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """
+        Looks up an entry and marks it as the most recently used
+
+        Parameters:
+            key (hashable): Key of entry
+            default (any): Returned if there is no entry for key
+
+        Returns:
+            any: Value of entry, or default
+        """
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return value
+
+    def put(self, key, value) -> None:
+        """
+        Adds or replaces an entry, evicting the least recently used entries if full
+
+        Parameters:
+            key (hashable): Key of entry
+            value (any): Value of entry
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Removes every entry and resets the statistics
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Number of hits, misses and evictions, the hit rate, and the current
+                and maximum number of entries
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
@@ -0,0 +1,62 @@
+from math import floor
+from numpy import (
+    abs,
+    arange,
+    argmax,
+    asarray,
+    concatenate,
+    isnan,
+    nanmean,
+    unique,
+    where,
+)
+
+
+def lttb(y, n_out: int, keep=None):
+    """
+    Selects the points to draw when downsampling a series with the
+        Largest-Triangle-Three-Buckets algorithm. Points are treated as equally spaced
+        on the x-axis. The points are split into n_out - 2 buckets, and from each bucket
+        the point forming the largest triangle with the previously selected point and
+        the average of the next bucket is kept. The first and last points are always
+        kept.
+
+    Parameters:
+        y (array-like): Series of y-values
+        n_out (int): Number of points to select
+        keep (array-like): Index of points that must be kept in addition to the selected
+            points, e.g., points that are part of a signal
+
+    Returns:
+        ndarray: Sorted index of the points to draw
+    """
+    y = asarray(y, dtype=float)
+    n = y.shape[0]
+    keep = arange(0) if keep is None else asarray(keep, dtype=int)
+
+    if n_out >= n or n_out < 3:
+        return arange(n)
+
+    every = (n - 2) / (n_out - 2)
+    selected = [0]
+    a = 0
+
+    for i in range(n_out - 2):
+        start = floor(i * every) + 1
+        end = floor((i + 1) * every) + 1
+        next_end = min(floor((i + 2) * every) + 1, n)
+
+        # Average point of the next bucket. For the last bucket this is the last point.
+        avg_x = (end + next_end - 1) / 2
+        avg_y = nanmean(y[end:next_end])
+
+        x = arange(start, end)
+        areas = abs(((a - avg_x) * (y[start:end] - y[a])) - ((a - x) * (avg_y - y[a])))
+        areas = where(isnan(areas), -1, areas)
+
+        a = start + int(argmax(areas))
+        selected.append(a)
+
+    selected.append(n - 1)
+
+    return unique(concatenate((asarray(selected), keep)))
@@ -0,0 +1,55 @@
+from numpy import (
+    asarray,
+    concatenate,
+    flatnonzero,
+    int64,
+    lexsort,
+    maximum,
+    zeros,
+)
+
+
+def merge_intervals(starts, stops, keys=None):
+    """
+    Merges overlapping [start, stop) index intervals into contiguous intervals in a
+        single sweep. Only intervals sharing the same key are merged, e.g., a run above
+        the mid line is never merged with a run below it. Intervals that only touch (the
+        stop of one equals the start of the next) are not merged.
+
+    Parameters:
+        starts (array-like): Index of the first point in each interval
+        stops (array-like): Index after the last point in each interval
+        keys (array-like): Optional non-negative integer or boolean key of each interval
+
+    Returns:
+        tuple: A tuple containing the following, sorted by start;
+            - ndarray: Index of the first point in each merged interval
+            - ndarray: Index after the last point in each merged interval
+            - ndarray: Key of each merged interval
+    """
+    starts = asarray(starts, dtype=int64)
+    stops = asarray(stops, dtype=int64)
+    keys = zeros(starts.shape[0], dtype=int64) if keys is None else asarray(keys)
+
+    if starts.shape[0] == 0:
+        return starts, stops, keys
+
+    # Offset each key into its own range so one running maximum covers all keys
+    offsets = keys.astype(int64) * (int(stops.max()) + 1)
+    order = lexsort((starts, keys))
+    shifted_starts = (starts + offsets)[order]
+    shifted_stops = (stops + offsets)[order]
+
+    # A new interval begins wherever the start is past every stop seen so far
+    running_stops = maximum.accumulate(shifted_stops)
+    new_interval = concatenate(([True], shifted_starts[1:] >= running_stops[:-1]))
+    first = flatnonzero(new_interval)
+
+    merged_keys = keys[order][first]
+    merged_offsets = offsets[order][first]
+    merged_starts = shifted_starts[first] - merged_offsets
+    merged_stops = maximum.reduceat(shifted_stops, first) - merged_offsets
+
+    order = lexsort((merged_keys, merged_starts))
+
+    return merged_starts[order], merged_stops[order], merged_keys[order]
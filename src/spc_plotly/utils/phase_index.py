@@ -0,0 +1,50 @@
+from numpy import (
+    array,
+    asarray,
+    ndarray,
+    searchsorted,
+    sort,
+    unique,
+)
+from spc_plotly.utils.baseline_index import _bound
+
+
+def phase_index(
+    x_dt,
+    breakpoints: list,
+    date_format: str,
+    unit: str,
+    x_name: str = None,
+) -> ndarray:
+    """
+    Numbers the phase each point belongs to, without formatting the x-values. The first
+        phase starts at the first point, and each breakpoint starts a new phase: a point
+        belongs to the phase of the last breakpoint whose label starts at or before it.
+
+    Parameters:
+        x_dt (array-like): Series of x-values, datetime format
+        breakpoints (list[str]): Labels, formatted with date_format, at which a new
+            phase starts. Order does not matter.
+        date_format (str): Format of the labels (e.g., "%Y-%m")
+        unit (str): NumPy datetime unit matching date_format (e.g., "M")
+        x_name (str): Name of the x-values, for error messages
+
+    Returns:
+        ndarray: Phase of each point, starting at 0
+
+    Raises:
+        ValueError: If a breakpoint does not match the label of any point
+    """
+    x = asarray(x_dt, dtype="datetime64[ns]")
+    sorted_x = x if (x[1:] >= x[:-1]).all() else sort(x)
+
+    starts = []
+    for label in breakpoints:
+        start, end = _bound(label, date_format, unit, x_name)
+        i = searchsorted(sorted_x, start)
+        if not (i < sorted_x.shape[0] and sorted_x[i] < end):
+            e = f"{label} not present in {x_name}"
+            raise ValueError(e)
+        starts.append(start)
+
+    return searchsorted(unique(array(starts, dtype="datetime64[ns]")), x, side="right")
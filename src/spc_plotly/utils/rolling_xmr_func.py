@@ -0,0 +1,59 @@
+from numpy import (
+    arange,
+    asarray,
+    concatenate,
+    cumsum,
+    errstate,
+    int64,
+    isnan,
+    maximum,
+    nan,
+    ndarray,
+    where,
+)
+from pandas import Series
+
+
+def rolling_xmr_func(data, window: int = None, func: str = "mean") -> ndarray:
+    """
+    Calculate aggregate function over the trailing window ending at each value, in a
+        single pass. The mean is taken from prefix sums and the median from a rolling
+        median (skiplist), so the cost does not grow with the window. Missing values
+        are ignored.
+
+    Parameters:
+        data (Series|ndarray): Series or array of values
+        window (int): Number of most recent values in each window. If None, every
+            value up to and including the current one is used (expanding window).
+        func (str): Mean or median
+
+    Returns:
+        ndarray: Mean or median of each window. NaN where a window has no values.
+    """
+    values = asarray(data, dtype=float)
+    n = values.shape[0]
+
+    if func == "mean":
+        missing = isnan(values)
+        sums = concatenate(([0.0], cumsum(where(missing, 0.0, values))))
+        counts = concatenate(([0], cumsum(~missing, dtype=int64)))
+
+        stops = arange(1, n + 1)
+        starts = 0 if window is None else maximum(stops - window, 0)
+        window_counts = counts[stops] - counts[starts]
+        with errstate(divide="ignore", invalid="ignore"):
+            return where(
+                window_counts > 0,
+                (sums[stops] - sums[starts]) / window_counts,
+                nan,
+            )
+    elif func == "median":
+        values = Series(values)
+        windows = (
+            values.expanding(min_periods=1)
+            if window is None
+            else values.rolling(window, min_periods=1)
+        )
+        return windows.median().to_numpy()
+    else:
+        raise ValueError("Invalid function")
@@ -0,0 +1,41 @@
+class RunningMean:
+    """
+    Mean of a collection of values that is updated in constant time as values are added
+        or removed. Missing values are ignored.
+    """
+
+    def __init__(self) -> None:
+        self.total = 0.0
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, value: float) -> None:
+        """
+        Adds a value
+
+        Parameters:
+            value (float): Value to add
+        """
+        if value == value:
+            self.total += value
+            self.count += 1
+
+    def remove(self, value: float) -> None:
+        """
+        Removes a value that was previously added
+
+        Parameters:
+            value (float): Value to remove
+        """
+        if value == value:
+            self.total -= value
+            self.count -= 1
+
+    def value(self) -> float:
+        """
+        Returns:
+            float: Mean of the values. NaN if there are no values.
+        """
+        return self.total / self.count if self.count > 0 else float("nan")
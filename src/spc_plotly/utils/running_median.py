@@ -0,0 +1,143 @@
+from heapq import heapify, heappop, heappush
+
+
+class RunningMedian:
+    """
+    Median of a collection of values that is updated in O(log n) time as values are
+        added or removed. Values are split between a max-heap holding the lower half and
+        a min-heap holding the upper half. Removed values are only dropped from a heap
+        once they reach its top, and a heap is rebuilt once it holds more removed values
+        than values, so memory and update time depend on the number of values, not on
+        the number of values ever added. Missing values are ignored.
+    """
+
+    def __init__(self) -> None:
+        self._low = []  # Lower half, negated so the largest value is on top
+        self._high = []
+        self._low_size = 0
+        self._high_size = 0
+        # Count of removed entries still in each heap, by heap entry
+        self._removed = {-1: {}, 1: {}}
+
+    def __len__(self) -> int:
+        return self._low_size + self._high_size
+
+    def _prune(self, heap: list, sign: int) -> None:
+        """
+        Drops removed values from the top of a heap
+
+        Parameters:
+            heap (list): Heap to prune
+            sign (int): -1 for the lower half (negated values), 1 for the upper half
+        """
+        removed = self._removed[sign]
+        while heap and heap[0] in removed:
+            self._discard(removed, heappop(heap))
+
+    def _discard(self, removed: dict, entry: float) -> None:
+        """
+        Marks one removed heap entry as dropped
+
+        Parameters:
+            removed (dict): Count of removed entries of the heap, by heap entry
+            entry (float): Heap entry that was dropped
+        """
+        if removed[entry] == 1:
+            del removed[entry]
+        else:
+            removed[entry] -= 1
+
+    def _compact(self, heap: list, sign: int) -> None:
+        """
+        Rebuilds a heap without its removed entries once they outnumber its values
+
+        Parameters:
+            heap (list): Heap to compact
+            sign (int): -1 for the lower half (negated values), 1 for the upper half
+        """
+        size = self._low_size if sign == -1 else self._high_size
+        if len(heap) - size <= size:
+            return
+
+        removed = self._removed[sign]
+        kept = []
+        for entry in heap:
+            if entry in removed:
+                self._discard(removed, entry)
+            else:
+                kept.append(entry)
+        heapify(kept)
+        heap[:] = kept
+
+    def _rebalance(self) -> None:
+        """
+        Keeps the lower half the same size as the upper half, or one value larger
+        """
+        if self._low_size > self._high_size + 1:
+            heappush(self._high, -heappop(self._low))
+            self._low_size -= 1
+            self._high_size += 1
+            self._prune(self._low, -1)
+        elif self._low_size < self._high_size:
+            heappush(self._low, -heappop(self._high))
+            self._high_size -= 1
+            self._low_size += 1
+            self._prune(self._high, 1)
+
+    def add(self, value: float) -> None:
+        """
+        Adds a value
+
+        Parameters:
+            value (float): Value to add
+        """
+        if value != value:
+            return
+
+        if self._low_size == 0 or value <= -self._low[0]:
+            heappush(self._low, -value)
+            self._low_size += 1
+        else:
+            heappush(self._high, value)
+            self._high_size += 1
+
+        self._rebalance()
+
+    def remove(self, value: float) -> None:
+        """
+        Removes a value that was previously added
+
+        Parameters:
+            value (float): Value to remove
+        """
+        if value != value:
+            return
+
+        # The top of each heap is never a removed entry, so a value no larger than the
+        #   top of the lower half is in the lower half
+        if value <= -self._low[0]:
+            removed = self._removed[-1]
+            removed[-value] = removed.get(-value, 0) + 1
+            self._low_size -= 1
+            self._prune(self._low, -1)
+        else:
+            removed = self._removed[1]
+            removed[value] = removed.get(value, 0) + 1
+            self._high_size -= 1
+            self._prune(self._high, 1)
+
+        self._rebalance()
+        self._compact(self._low, -1)
+        self._compact(self._high, 1)
+
+    def value(self) -> float:
+        """
+        Returns:
+            float: Median of the values. NaN if there are no values.
+        """
+        if len(self) == 0:
+            return float("nan")
+        elif self._low_size > self._high_size:
+            return float(-self._low[0])
+        else:
+            return (-self._low[0] + self._high[0]) / 2
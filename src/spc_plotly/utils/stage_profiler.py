@@ -0,0 +1,66 @@
+import tracemalloc
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class StageProfiler:
+    """
+    Records the wall time, and optionally the peak allocated memory, of named stages,
+        along with counters describing the input (e.g., number of points or runs).
+        When disabled, stages and counters are not recorded and add almost no overhead.
+
+    Memory is measured with tracemalloc, which slows down the profiled code. If
+        tracemalloc is already tracing, its peak is reset at the start of each stage.
+    """
+
+    def __init__(self, enabled: bool = False, trace_memory: bool = False) -> None:
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.results = {"stages": {}, "counters": {}}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Times the code run inside the context. If a stage is run more than once, its
+            times are added up and the largest peak is kept.
+
+        Parameters:
+            name (str): Name of stage
+        """
+        if not self.enabled:
+            yield
+            return
+
+        started_tracing = False
+        if self.trace_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                started_tracing = True
+            memory_before = tracemalloc.get_traced_memory()[0]
+
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            result = self.results["stages"].setdefault(name, {"seconds": 0.0})
+            result["seconds"] += elapsed
+
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1] - memory_before
+                result["peak_memory"] = max(result.get("peak_memory", 0), peak)
+                if started_tracing:
+                    tracemalloc.stop()
+
+    def count(self, name: str, value: int) -> None:
+        """
+        Records a counter
+
+        Parameters:
+            name (str): Name of counter
+            value (int): Value of counter
+        """
+        if self.enabled:
+            self.results["counters"][name] = int(value)
@@ -0,0 +1,146 @@
+from pandas import to_datetime
+
+
+def validate_inputs(XmR, date_parts) -> bool:
+
+    validate_xmr_func_val(XmR.xmr_function)
+    validate_sloped_val(XmR.sloped)
+    validate_date_part_resolution_val(XmR.date_part_resolution, date_parts)
+    validate_custom_date_part_val(XmR.date_part_resolution, XmR.custom_date_part)
+
+    return True
+
+
+def validate_xmr_func_val(xmr_func_val):
+    if xmr_func_val.lower() not in ["mean", "median"]:
+        e = f"{xmr_func_val} not a valid xmr function option. Must be 'mean' or 'median'"
+        raise ValueError(e)
+
+    return True
+
+
+def validate_date_part_resolution_val(date_part_resolution_val, date_parts):
+    if date_part_resolution_val.lower() not in date_parts.keys():
+        vals = list(date_parts.keys())
+        e = f"{date_part_resolution_val} not a valid date part resolution. Must be {vals}"
+        raise ValueError(e)
+
+    return True
+
+
+def validate_custom_date_part_val(date_part_resolution_val, custom_date_part_val):
+    if date_part_resolution_val == "custom":
+        if custom_date_part_val is None or custom_date_part_val == "":
+            e = "Must specify a valid date part format. Please visit https://d3js.org/d3-time-format for reference."
+            raise ValueError(e)
+
+    return True
+
+
+def validate_x_ser_name_val(x_ser_name, data):
+    if x_ser_name in data.columns or x_ser_name == data.index.name:
+        return True
+    else:
+        e = f"{x_ser_name} not a valid column or index in your dataframe"
+        raise ValueError(e)
+
+
+def validate_x_ser_is_date(x_Ser):
+    try:
+        to_datetime(x_Ser)
+    except:
+        e = f"{x_Ser.name} can not be converted to datetime format. Please inspect data for erroneous values."
+        raise TypeError(e)
+
+
+def validate_group_ser_name_val(group_ser_name, data):
+    if group_ser_name not in data.columns:
+        e = f"{group_ser_name} not a valid group column"
+        raise ValueError(e)
+
+    return True
+
+
+def validate_y_ser_name_val(y_ser_name, data):
+    if y_ser_name not in data.columns:
+        e = f"{y_ser_name} not a valid column"
+        raise ValueError(e)
+
+    return True
+
+
+def validate_cutoff_val(cutoff_val, x_Ser):
+    if cutoff_val is None or cutoff_val in x_Ser.values:
+        return True
+    else:
+        e = f"{cutoff_val} not present in {x_Ser.name}"
+        raise ValueError(e)
+
+
+def validate_begin_val(begin_val, x_Ser):
+    if begin_val is None or begin_val in x_Ser.values:
+        return True
+    else:
+        e = f"{begin_val} not present in {x_Ser.name}"
+        raise ValueError(e)
+
+
+def validate_sloped_val(sloped_val):
+    if not isinstance(sloped_val, bool):
+        e = f"sloped parameter must be a boolean value"
+        raise ValueError(e)
+
+
+def validate_window_val(window_val, sloped_val=False):
+    if window_val is None:
+        return True
+    if window_val != "expanding" and (
+        isinstance(window_val, bool)
+        or not isinstance(window_val, int)
+        or window_val < 2
+    ):
+        e = (
+            f"{window_val} not a valid window. "
+            "Must be an integer of at least 2 or 'expanding'"
+        )
+        raise ValueError(e)
+    if sloped_val:
+        e = "window can not be used with sloped limits"
+        raise ValueError(e)
+
+    return True
+
+
+def validate_phases_val(phases_val, sloped_val=False, window_val=None):
+    if phases_val is None:
+        return True
+    if phases_val != "auto" and not isinstance(phases_val, (list, tuple)):
+        e = "phases must be 'auto' or a list of x-values at which a new phase starts"
+        raise ValueError(e)
+    if sloped_val or window_val is not None:
+        e = "phases can not be used with sloped limits or a window"
+        raise ValueError(e)
+
+    return True
+
+
+def validate_render_mode_val(render_mode_val, render_modes):
+    if render_mode_val.lower() not in render_modes:
+        e = f"{render_mode_val} not a valid render mode. Must be {render_modes}"
+        raise ValueError(e)
+
+    return True
+
+
+def validate_max_points_val(max_points_val):
+    if max_points_val is None:
+        return True
+    if (
+        isinstance(max_points_val, bool)
+        or not isinstance(max_points_val, int)
+        or max_points_val < 3
+    ):
+        e = f"{max_points_val} not a valid max_points. Must be an integer of at least 3"
+        raise ValueError(e)
+
+    return True
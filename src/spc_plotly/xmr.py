@@ -1,16 +1,44 @@
+from logging import getLogger
+from typing import TYPE_CHECKING, Callable
 from pandas import DataFrame, Series, to_datetime
-from numpy import abs
-from spc_plotly.helpers import (
-    axes_formats,
-    base_traces,
-    limit_lines,
-    annotations,
-    signals,
-    menus,
+from numpy import (
+    abs,
+    arange,
+    array,
+    concatenate,
+    cumsum,
+    empty,
+    flatnonzero,
+    full,
+    isnan,
+    maximum,
+    nan,
+    ndarray,
+    searchsorted,
+    unique,
+    where,
+    zeros,
 )
-from spc_plotly.utils import calc_xmr_func
-from tests import test_xmr
-from plotly.graph_objects import Figure
+from spc_plotly.helpers import signals
+from spc_plotly.utils import (
+    baseline_index,
+    calc_xmr_func,
+    changepoints,
+    disk_cache,
+    fingerprint,
+    interval_mask,
+    lru_cache,
+    lttb,
+    merge_intervals,
+    phase_index,
+    rolling_xmr_func,
+    stage_profiler,
+)
+from spc_plotly import validation
+
+if TYPE_CHECKING:
+    # Plotly is only imported once a figure is built
+    from plotly.graph_objects import Figure
 
 date_parts = {
     "year": "%Y",
@@ -21,15 +49,72 @@ date_parts = {
     "custom": None,
 }
 
+# NumPy datetime unit of each date part, used to locate x_begin/x_cutoff without
+#   formatting every x-value. Custom formats are compared as formatted labels.
+date_units = {
+    "year": "Y",
+    "month": "M",
+    "day": "D",
+    "hour": "h",
+    "minute": "m",
+}
+
 XmR_constants = {
     "mean": {"mR_Upper": 3.268, "npl_Constant": 2.660},
     "median": {"mR_Upper": 3.865, "npl_Constant": 3.145},
 }
 
+logger = getLogger(__name__)
+
+render_modes = ["auto", "svg", "webgl"]
+
+# Number of points above which render_mode="auto" switches to WebGL traces
+webgl_point_threshold = 5000
+
+
+def _segment_first(segment: ndarray) -> ndarray:
+    """
+    Locates the first point of the stretch of consecutive points with the same segment
+        number that each point belongs to, so trailing windows never cross segments.
+
+    Parameters:
+        segment (ndarray): Segment number of each point (e.g., phase)
+
+    Returns:
+        ndarray: Index of the first point of each point's stretch
+    """
+    idx = arange(segment.shape[0])
+    change = idx == 0
+    change[1:] = segment[1:] != segment[:-1]
+
+    return maximum.accumulate(where(change, idx, 0))
+
+
+def _per_point(values: ndarray, mask: ndarray) -> ndarray:
+    """
+    Spreads values calculated over the masked points back onto every point. Each point
+        takes the value of the last masked point at or before it, so points before the
+        first masked point are NaN and points after the last one keep its value.
+
+    Parameters:
+        values (ndarray): One value per masked point
+        mask (ndarray): Boolean array, True for each masked point
+
+    Returns:
+        ndarray: One value per point
+    """
+    last = cumsum(mask) - 1
+    result = full(mask.shape[0], nan)
+    result[last >= 0] = values[last[last >= 0]]
+
+    return result
+
 
-class XmR:
+class XmRStats:
     """
-    A class representing an XmR chart.
+    A class representing the statistics behind an XmR chart: limit values and signals.
+    No Plotly figure is built, which makes it suitable for computing limits for a
+    large number of metrics.
 
     Attributes:
         data (str): Dataframe to use for XmR chart.
@@ -47,11 +132,18 @@ class XmR:
             - hour
             - minute
             - custom
-        title (str): Custom chart title
         sloped (bool): Use sloping approach for limit values. Only use this if your data
             is expected to increase over time (e.g., energy prices).
         xmr_function (str): Use "mean" or "median" function for calculating limit values
-        chart_height (int): Adjust chart height
+        window (int|str): Number of most recent baseline points the limits at each point
+            are calculated from, "expanding" for every baseline point so far, or None.
+        phases (list): x-values at which a new phase, with its own limits, starts. If
+            detected automatically, the chosen x-values.
+        phase_limits (DataFrame): If phases are set, one row per phase with its first
+            x-value and limits. Otherwise None.
+        profile_stats (dict): If profiling, the time ("seconds") and peak memory
+            ("peak_memory", bytes) of each stage under "stages", and counters under
+            "counters". Otherwise None.
     """
 
     def __init__(
@@ -63,13 +155,17 @@ class XmR:
         x_cutoff: str = None,
         date_part_resolution: str = "month",
         custom_date_part: str = "",
-        title: str = None,
         sloped: bool = False,
         xmr_function: str = "mean",
-        chart_height: int = None,
+        window: int | str = None,
+        phases: list = None,
+        cache: lru_cache.LRUCache | disk_cache.DiskCache = None,
+        profile: bool = False,
+        profile_memory: bool = False,
+        profile_callback: Callable[[dict], None] = None,
     ) -> None:
         """
-        Initializes an XmR Chart object.
+        Initializes an XmR statistics object.
 
         Parameters:
             data (str): Dataframe to use for XmR chart.
@@ -89,75 +185,327 @@ class XmR:
                 - minute
                 - custom
             custom_date_part (str): If you choose custom, please specify the d3 format corresponding to your data.
-            title (str): Custom chart title
             sloped (bool): Use sloping approach for limit values. Only use this if your data
                 is expected to increase over time (e.g., energy prices).
             xmr_function (str): Use "mean" or "median" function for calculating limit values
-            chart_height (int): Adjust chart height
+            window (int|str): If set, the limits are recalculated at every point from
+                the most recent baseline points, giving limit values with one value per
+                point. An integer uses that many points (at least 2), and "expanding"
+                uses every baseline point so far. Points before x_begin have no limits,
+                and the limits are frozen after x_cutoff, as in XmRStream. Can not be
+                combined with sloped.
+            phases (list): Values of x_ser_name, formatted like x_begin, at which a new
+                phase starts (e.g., after a known change to the process). Each phase's
+                limits are calculated from its own points between x_begin and x_cutoff,
+                and runs do not cross phases. A phase without such points keeps the
+                limits of the previous phase. All phases are calculated in one pass, and
+                the limit values have one value per point. Can not be combined with
+                sloped or window.
+                If "auto", phases start where the level of the process shifts, detected
+                with utils.changepoints. The detected x-values are stored in phases.
+            cache (LRUCache|DiskCache): If set, the limits and signals are stored in the
+                cache, keyed by a fingerprint of the x- and y-values and the parameters,
+                and reused by any later object built from the same values and
+                parameters. Arrays cached in an LRUCache are shared between objects and
+                must not be modified.
+            profile (bool): Record the wall time of each stage and counters such as the
+                number of points and runs in profile_stats, and log them to the
+                "spc_plotly.xmr" logger at INFO level.
+            profile_memory (bool): Also record the peak memory allocated by each stage,
+                using tracemalloc. Implies profile.
+            profile_callback (callable): Called with profile_stats once the limits and
+                signals are calculated, and again once the figure is built. Implies
+                profile.
         """
 
+        self._profiler = stage_profiler.StageProfiler(
+            enabled=profile or profile_memory or profile_callback is not None,
+            trace_memory=profile_memory,
+        )
+        self._profile_callback = profile_callback
+        self.profile_stats = self._profiler.results if self._profiler.enabled else None
+
         self.data = data
         self.xmr_function = xmr_function.lower()
         self.sloped = sloped
+        self.window = window
+        self.phases = phases
         self.date_part_resolution = date_part_resolution.lower()
         if self.date_part_resolution == "custom":
             self.custom_date_part = custom_date_part
         else:
             self.custom_date_part = date_parts.get(self.date_part_resolution, None)
 
-        test_xmr.test_inputs(self, date_parts)
+        with self._profiler.stage("validation"):
+            validation.validate_inputs(self, date_parts)
+            validation.validate_window_val(self.window, self.sloped)
+            validation.validate_phases_val(self.phases, self.sloped, self.window)
 
-        test_xmr.test_y_ser_name_val(y_ser_name, self.data)
-        self._y_ser_name = y_ser_name
-        self._y_Ser = data[self._y_ser_name]
+            validation.validate_y_ser_name_val(y_ser_name, self.data)
+            self._y_ser_name = y_ser_name
+            self._y_Ser = data[self._y_ser_name]
 
-        test_xmr.test_x_ser_name_val(x_ser_name, self.data)
-        self._x_ser_name = x_ser_name
+            validation.validate_x_ser_name_val(x_ser_name, self.data)
+            self._x_ser_name = x_ser_name
 
-        self._x_Ser = (
-            data[self._x_ser_name] if self._x_ser_name in data.columns else data.index
-        )
+            x_Ser = (
+                data[self._x_ser_name]
+                if self._x_ser_name in data.columns
+                else data.index.to_series(name=self._x_ser_name)
+            )
 
-        test_xmr.test_x_ser_is_date(self._x_Ser)
-        self._x_Ser_dt = to_datetime(self._x_Ser)
-        self._x_Ser = self._x_Ser_dt.dt.strftime(self.custom_date_part)
+        with self._profiler.stage("parse_dates"):
+            validation.validate_x_ser_is_date(x_Ser)
+            self._x_Ser_dt = to_datetime(x_Ser)
+            if self._x_Ser_dt.dt.tz is not None:
+                # Labels show local time, so bounds are compared in local time too
+                self._x_Ser_dt = self._x_Ser_dt.dt.tz_localize(None)
+            self._x_labels = None
 
-        test_xmr.test_cutoff_val(x_cutoff, self._x_Ser)
-        # Check if cutoff value exists
-        if x_cutoff is None:
-            self.x_cutoff = self._x_Ser.max()
-        else:
-            self.x_cutoff = x_cutoff
+        with self._profiler.stage("baseline"):
+            date_unit = date_units.get(self.date_part_resolution)
+            if date_unit is None:
+                validation.validate_cutoff_val(x_cutoff, self._x_Ser)
+                validation.validate_begin_val(x_begin, self._x_Ser)
+                self.x_cutoff = self._x_Ser.max() if x_cutoff is None else x_cutoff
+                self.x_begin = self._x_Ser.min() if x_begin is None else x_begin
+                self._baseline = (
+                    (self._x_Ser >= self.x_begin) & (self._x_Ser <= self.x_cutoff)
+                ).to_numpy()
+            else:
+                self._baseline = baseline_index.baseline_index(
+                    self._x_Ser_dt,
+                    x_begin,
+                    x_cutoff,
+                    self.custom_date_part,
+                    date_unit,
+                    x_name=self._x_ser_name,
+                )
+                # Only the first and last x-values are formatted
+                self.x_cutoff = (
+                    self._x_Ser_dt.max().strftime(self.custom_date_part)
+                    if x_cutoff is None
+                    else x_cutoff
+                )
+                self.x_begin = (
+                    self._x_Ser_dt.min().strftime(self.custom_date_part)
+                    if x_begin is None
+                    else x_begin
+                )
 
-        test_xmr.test_begin_val(x_begin, self._x_Ser)
-        # Check if cutoff value exists
-        if x_begin is None:
-            self.x_begin = self._x_Ser.min()
-        else:
-            self.x_begin = x_begin
-
-        self._title = (
-            f"{y_ser_name} XmR Chart by {self._x_Ser.name}" if title is None else title
-        )
+        with self._profiler.stage("phases"):
+            self._phase = None
+            self._phase_first = None
+            if self.phases == "auto":
+                starts = changepoints.changepoints(self._y_Ser)
+                # Phases follow the order of the data
+                self._phase = searchsorted(
+                    starts, arange(self.data.shape[0]), side="right"
+                )
+                self._phase_first = _segment_first(self._phase)
+                self.phases = (
+                    self._x_Ser_dt.iloc[starts]
+                    .dt.strftime(self.custom_date_part)
+                    .to_list()
+                )
+            elif self.phases is not None:
+                if date_unit is None:
+                    for phase_start in self.phases:
+                        validation.validate_begin_val(phase_start, self._x_Ser)
+                    phase = searchsorted(
+                        unique(array(self.phases, dtype=object)),
+                        self._x_Ser.to_numpy(),
+                        side="right",
+                    )
+                else:
+                    phase = phase_index.phase_index(
+                        self._x_Ser_dt,
+                        self.phases,
+                        self.custom_date_part,
+                        date_unit,
+                        x_name=self._x_ser_name,
+                    )
+                # Number phases from 0 without gaps, e.g., if a phase starts at the
+                #   first point
+                self._phase = unique(phase, return_inverse=True)[1]
+                self._phase_first = _segment_first(self._phase)
 
         # Set constant values for mean or median
         self.mR_Upper_Constant = XmR_constants.get(xmr_function).get("mR_Upper")
         self.npl_Constant = XmR_constants.get(xmr_function).get("npl_Constant")
 
-        # Calculate limit values
-        (
-            self.data_for_limits,
-            self.mR_data,
-            self.mR_limit_values,
-            self.npl_limit_values,
-        ) = self._limits()
+        self._signals = None
+        self._signal_events = None
+        self._signal_masks = None
 
-        # Add selected function to mR and npl dictionaries for reference
-        self.mR_limit_values["xmr_func"] = self.xmr_function
-        self.npl_limit_values["xmr_func"] = self.xmr_function
+        self._cache = cache
+        self._cache_key = None
+        cached = None
+        if cache is not None:
+            with self._profiler.stage("cache_lookup"):
+                self._cache_key = self._fingerprint()
+                cached = cache.get(self._cache_key)
+            self._profiler.count("cache_hit", cached is not None)
 
-        self._height = chart_height
-        self.xmr_chart, self.signals = self._XmR_chart()
+        if cached is None:
+            # Calculate limit values
+            with self._profiler.stage("limits"):
+                self.phase_limits = (
+                    None if self._phase is None else self._phase_limits()
+                )
+                (
+                    self.data_for_limits,
+                    self.mR_data,
+                    self.mR_limit_values,
+                    self.npl_limit_values,
+                ) = self._limits()
+
+            # Add selected function to mR and npl dictionaries for reference
+            self.mR_limit_values["xmr_func"] = self.xmr_function
+            self.npl_limit_values["xmr_func"] = self.xmr_function
+
+            self._find_signals()
+            if cache is not None:
+                cache.put(self._cache_key, self._cached_results())
+        else:
+            self._restore_results(cached)
+
+        self._profiler.count("n_points", self.data.shape[0])
+        self._profiler.count("n_baseline", self.data_for_limits.shape[0])
+        if self.phase_limits is not None:
+            self._profiler.count("n_phases", self.phase_limits.shape[0])
+        self._report_profile()
+
+    def _fingerprint(self) -> str:
+        """
+        Returns:
+            str: Key identifying the limits and signals, from the x- and y-values and
+                every parameter they depend on
+        """
+        return fingerprint.fingerprint(
+            [
+                self._y_Ser.to_numpy(dtype=float),
+                self._x_Ser_dt.to_numpy(dtype="datetime64[ns]"),
+            ],
+            {
+                "x_begin": self.x_begin,
+                "x_cutoff": self.x_cutoff,
+                "date_part_resolution": self.date_part_resolution,
+                "custom_date_part": self.custom_date_part,
+                "sloped": self.sloped,
+                "xmr_function": self.xmr_function,
+                "window": self.window,
+                "phases": None if self.phases is None else tuple(self.phases),
+            },
+        )
+
+    def _cached_results(self) -> dict:
+        """
+        Returns:
+            dict: Limits and signal intervals, as stored in the cache
+        """
+        return {
+            "mR_limit_values": self.mR_limit_values,
+            "npl_limit_values": self.npl_limit_values,
+            "phase_limits": self.phase_limits,
+            "mR_anomaly_index": self._mR_anomaly_index,
+            "anomaly_intervals": self._anomaly_intervals,
+            "long_run_intervals": self._long_run_intervals,
+            "short_run_intervals": self._short_run_intervals,
+        }
+
+    def _restore_results(self, cached: dict) -> None:
+        """
+        Sets the limits and signal intervals from a cache entry. The data used for
+            limits and moving ranges are taken from this object's data.
+
+        Parameters:
+            cached (dict): Cache entry, from _cached_results
+        """
+        self.data_for_limits = self.data.iloc[self._baseline]
+        self.mR_data = abs(
+            self.data[self._y_ser_name] - self.data[self._y_ser_name].shift(1)
+        )
+        # Copies, so adding keys to one object's dictionaries leaves the entry as is
+        self.mR_limit_values = dict(cached["mR_limit_values"])
+        self.npl_limit_values = dict(cached["npl_limit_values"])
+        self.phase_limits = (
+            None if cached["phase_limits"] is None else cached["phase_limits"].copy()
+        )
+        self._mR_anomaly_index = cached["mR_anomaly_index"]
+        self._anomaly_intervals = cached["anomaly_intervals"]
+        self._long_run_intervals = cached["long_run_intervals"]
+        self._short_run_intervals = cached["short_run_intervals"]
+
+    def _report_profile(self) -> None:
+        """
+        Passes the profiling results to the callback and the logger, if profiling
+        """
+        if not self._profiler.enabled:
+            return
+
+        logger.info("XmR profile: %s", self.profile_stats)
+        if self._profile_callback is not None:
+            self._profile_callback(self.profile_stats)
+
+    @property
+    def _x_Ser(self) -> Series:
+        """
+        x-values formatted with custom_date_part, for display. Formatting every x-value
+            is expensive for long series, so the labels are only built the first time
+            they are needed (e.g., when the figure is rendered) and then cached.
+
+        Returns:
+            Series: Series of formatted x-values
+        """
+        if self._x_labels is None:
+            self._x_labels = self._x_Ser_dt.dt.strftime(self.custom_date_part)
+
+        return self._x_labels
+
+    def _signal_index(self) -> ndarray:
+        """
+        Returns:
+            ndarray: Sorted index of every point that is part of a signal
+        """
+        n = self.data.shape[0]
+        points = interval_mask.interval_mask(
+            concatenate(
+                (
+                    self._anomaly_intervals[0],
+                    self._long_run_intervals[0],
+                    self._short_run_intervals[0],
+                )
+            ),
+            concatenate(
+                (
+                    self._anomaly_intervals[1],
+                    self._long_run_intervals[1],
+                    self._short_run_intervals[1],
+                )
+            ),
+            n,
+        )
+        points[self._mR_anomaly_index] = True
+
+        return flatnonzero(points)
+
+    def _signal_labels(self) -> ndarray:
+        """
+        Formats the x-values of the points that are part of a signal. Other points are
+            left empty, so only the labels that appear in the signals are built.
+
+        Returns:
+            ndarray: Formatted x-value of each point that is part of a signal, else None
+        """
+        if self._x_labels is not None:
+            return self._x_labels.to_numpy()
+
+        idx = self._signal_index()
+        x = empty(self.data.shape[0], dtype=object)
+        x[idx] = self._x_Ser_dt.iloc[idx].dt.strftime(self.custom_date_part).to_numpy()
+
+        return x
 
     def _limits(self) -> tuple[DataFrame, Series, dict, dict]:
         """
@@ -171,24 +519,43 @@ class XmR:
                 - dict: Contains the natural process limits and mean/median value
         """
 
-        data_for_limits = self.data.loc[
-            (self._x_Ser >= self.x_begin) & (self._x_Ser <= self.x_cutoff)
-        ]
+        data_for_limits = self.data.iloc[self._baseline]
 
         mR_data_for_limits = abs(
             data_for_limits[self._y_ser_name]
             - data_for_limits[self._y_ser_name].shift(1)
         )
 
-        # Calculate mean/median values
-        mR_xmr_func = calc_xmr_func.calc_xmr_func(mR_data_for_limits, self.xmr_function)
-        y_xmr_func = calc_xmr_func.calc_xmr_func(
-            data_for_limits[self._y_ser_name], self.xmr_function
-        )
+        # Calculate mean/median values, at each point if using a window or phases
+        if self.window is not None:
+            mR_xmr_func, y_xmr_func = self._rolling_limits()
+        elif self._phase is not None:
+            mR_xmr_func = self.phase_limits["mR_xmr_func"].to_numpy()[self._phase]
+            y_xmr_func = self.phase_limits["y_xmr_func"].to_numpy()[self._phase]
+        else:
+            mR_xmr_func = calc_xmr_func.calc_xmr_func(
+                mR_data_for_limits, self.xmr_function
+            )
+            y_xmr_func = calc_xmr_func.calc_xmr_func(
+                data_for_limits[self._y_ser_name], self.xmr_function
+            )
 
         mR_upper = mR_xmr_func * self.mR_Upper_Constant
 
-        if self.sloped:
+        if self.window is not None or self._phase is not None:
+            return (
+                data_for_limits,
+                abs(self.data[self._y_ser_name] - self.data[self._y_ser_name].shift(1)),
+                {"mR_xmr_func": mR_xmr_func, "mR_upper_limit": mR_upper},
+                {
+                    "y_xmr_func": y_xmr_func,
+                    "npl_upper_limit": y_xmr_func + (self.npl_Constant * mR_xmr_func),
+                    "npl_lower_limit": maximum(
+                        y_xmr_func - (self.npl_Constant * mR_xmr_func), 0
+                    ),
+                },
+            )
+        elif self.sloped:
             # According to "Understanding Variation: The Key to Managing Chaos",
             #   we derive the slope of the mean/median line by getting the mean/median
             #   of the first half and second half of the data. We then solve for the
@@ -208,16 +575,14 @@ class XmR:
                 data_for_limits[self._y_ser_name].values[:half_idx], self.xmr_function
             ) - (m * (first_half_idx))
 
-            # Create list representing upper, mid, and lower sloped paths
-            sloped_path = [(i, (((i + 1) * m) + b)) for i in range(self.data.shape[0])]
-            lower_limit_sloped_path = [
-                (i[0], i[1] - (mR_xmr_func * self.mR_Upper_Constant))
-                for i in sloped_path
-            ]
-            upper_limit_sloped_path = [
-                (i[0], i[1] + (mR_xmr_func * self.mR_Upper_Constant))
-                for i in sloped_path
-            ]
+            # Mid-line, upper, and lower sloped paths, one value per point
+            sloped_path = (arange(1, self.data.shape[0] + 1) * m) + b
+            lower_limit_sloped_path = sloped_path - (
+                mR_xmr_func * self.mR_Upper_Constant
+            )
+            upper_limit_sloped_path = sloped_path + (
+                mR_xmr_func * self.mR_Upper_Constant
+            )
 
             return (
                 data_for_limits,
@@ -244,12 +609,249 @@ class XmR:
                 },
             )
 
-    def _XmR_chart(self) -> tuple[Figure, dict]:
+    def _rolling_limits(self) -> tuple[ndarray, ndarray]:
         """
-        Creates the XmR chart
+        Calculates the moving range and y-value mean/median at each point from the
+            trailing window of baseline points, in a single pass over the baseline.
+            Moving ranges are only part of the baseline if both of their points are, so
+            each window holds one fewer moving range than y-values.
+
+        Returns:
+            tuple: A tuple containing the following;
+                - ndarray: Moving range mean/median at each point
+                - ndarray: Mean/median of y-values at each point
+        """
+        n = self.data.shape[0]
+        in_baseline = zeros(n, dtype=bool)
+        in_baseline[self._baseline] = True
+        mR_in_baseline = zeros(n, dtype=bool)
+        mR_in_baseline[1:] = in_baseline[1:] & in_baseline[:-1]
+
+        y = self._y_Ser.to_numpy(dtype=float)
+        mR = abs(y[1:] - y[:-1])
+        y_window, mR_window = (
+            (None, None)
+            if self.window == "expanding"
+            else (self.window, self.window - 1)
+        )
+
+        mR_xmr_func = _per_point(
+            rolling_xmr_func.rolling_xmr_func(
+                mR[mR_in_baseline[1:]], mR_window, self.xmr_function
+            ),
+            mR_in_baseline,
+        )
+        y_xmr_func = _per_point(
+            rolling_xmr_func.rolling_xmr_func(
+                y[in_baseline], y_window, self.xmr_function
+            ),
+            in_baseline,
+        )
+
+        # A window without values (e.g., only missing values) keeps the last limits
+        complete = ~(isnan(mR_xmr_func) | isnan(y_xmr_func))
+
+        return (
+            _per_point(mR_xmr_func[complete], complete),
+            _per_point(y_xmr_func[complete], complete),
+        )
+
+    def _phase_func(self, values: ndarray, mask: ndarray, n_phases: int) -> ndarray:
+        """
+        Calculates the mean/median of the masked values of each phase
+
+        Parameters:
+            values (ndarray): Array of values, one per point
+            mask (ndarray): True for each point to include
+            n_phases (int): Number of phases
+
+        Returns:
+            ndarray: Mean or median value of each phase. NaN if a phase has no points
+                to include.
+        """
+        grouped = Series(values[mask]).groupby(self._phase[mask])
+        result = grouped.mean() if self.xmr_function == "mean" else grouped.median()
+
+        return result.reindex(arange(n_phases)).to_numpy()
+
+    def _phase_limits(self) -> DataFrame:
+        """
+        Calculates the limits of every phase in one pass, with a grouped reduction over
+            the baseline points of all phases. The moving range between the last point
+            of a phase and the first point of the next is not part of either phase.
+
+        Returns:
+            DataFrame: One row per phase with its first x-value, number of points and
+                baseline points, and its moving range and natural process limits
+        """
+        n_phases = int(self._phase.max()) + 1 if self._phase.shape[0] > 0 else 0
+        in_baseline = zeros(self.data.shape[0], dtype=bool)
+        in_baseline[self._baseline] = True
+        mR_in_baseline = in_baseline.copy()
+        mR_in_baseline[0] = False
+        mR_in_baseline[1:] &= in_baseline[:-1] & (self._phase[1:] == self._phase[:-1])
+
+        y = self._y_Ser.to_numpy(dtype=float)
+        mR = concatenate(([nan], abs(y[1:] - y[:-1])))
+        mR_xmr_func = self._phase_func(mR, mR_in_baseline, n_phases)
+        y_xmr_func = self._phase_func(y, in_baseline, n_phases)
+
+        # A phase without baseline values keeps the limits of the previous phase
+        complete = ~(isnan(mR_xmr_func) | isnan(y_xmr_func))
+        mR_xmr_func = _per_point(mR_xmr_func[complete], complete)
+        y_xmr_func = _per_point(y_xmr_func[complete], complete)
+
+        phases = Series(self._phase)
+        return DataFrame(
+            {
+                "phase": arange(n_phases),
+                "start_x": self._x_Ser_dt.groupby(self._phase).min().to_numpy(),
+                "n_points": phases.value_counts().sort_index().to_numpy(),
+                "n_baseline": phases[in_baseline]
+                .value_counts()
+                .reindex(arange(n_phases), fill_value=0)
+                .to_numpy(),
+                "mR_xmr_func": mR_xmr_func,
+                "mR_upper_limit": mR_xmr_func * self.mR_Upper_Constant,
+                "y_xmr_func": y_xmr_func,
+                "npl_upper_limit": y_xmr_func + (self.npl_Constant * mR_xmr_func),
+                "npl_lower_limit": maximum(
+                    y_xmr_func - (self.npl_Constant * mR_xmr_func), 0
+                ),
+                "xmr_func": self.xmr_function,
+            }
+        )
+
+    def _limit_arrays(self) -> tuple:
+        """
+        Returns the natural process limits as values that can be compared against a
+            NumPy array of y-values.
+
+        Returns:
+            tuple: A tuple containing the following;
+                - float|ndarray: Natural process limit mid-line
+                - float|ndarray: Upper process limit
+                - float|ndarray: Lower process limit
+        """
+        return (
+            self.npl_limit_values.get("y_xmr_func"),
+            self.npl_limit_values.get("npl_upper_limit"),
+            self.npl_limit_values.get("npl_lower_limit"),
+        )
+
+    def _find_signals(self) -> None:
+        """
+        Identifies signals in the data using plain NumPy arrays. Each rule is stored as
+            intervals of points ([start, stop) index and direction), from which the
+            signal tables, masks and the signals dictionary are built.
+        """
+        y = self._y_Ser.to_numpy()
+        y_xmr_func, npl_upper, npl_lower = self._limit_arrays()
+
+        mR = self.mR_data.to_numpy()
+
+        with self._profiler.stage("anomalies"):
+            self._mR_anomaly_index = signals._mR_outside_limit(
+                mR, self.mR_limit_values.get("mR_upper_limit")
+            )
+            self._anomaly_intervals = signals._outside_limits(y, npl_upper, npl_lower)
+
+        with self._profiler.stage("long_runs"):
+            long_run_windows = signals._long_run_windows(
+                y, y_xmr_func, self._phase_first
+            )
+            self._long_run_intervals = merge_intervals.merge_intervals(
+                *long_run_windows
+            )
+
+        with self._profiler.stage("short_runs"):
+            short_run_windows = signals._short_run_windows(
+                y, npl_upper, npl_lower, y_xmr_func, self._phase_first
+            )
+            self._short_run_intervals = merge_intervals.merge_intervals(
+                *short_run_windows
+            )
+
+        self._profiler.count("n_anomalies", len(self._anomaly_intervals[0]))
+        self._profiler.count("n_mR_anomalies", len(self._mR_anomaly_index))
+        self._profiler.count("n_long_run_windows", len(long_run_windows[0]))
+        self._profiler.count("n_long_runs", len(self._long_run_intervals[0]))
+        self._profiler.count("n_short_run_windows", len(short_run_windows[0]))
+        self._profiler.count("n_short_runs", len(self._short_run_intervals[0]))
+
+    def _rule_intervals(self) -> dict:
+        """
+        Returns:
+            dict: Intervals of each rule ("anomaly", "long_run", "short_run")
+        """
+        return {
+            "anomaly": self._anomaly_intervals,
+            "long_run": self._long_run_intervals,
+            "short_run": self._short_run_intervals,
+        }
+
+    @property
+    def signal_events(self) -> DataFrame:
+        """
+        Signals as a table with one row per signal, built without a Python object per
+            point. Built the first time it is accessed and then cached.
+
+        Returns:
+            DataFrame: One row per signal with its rule ("anomaly", "long_run" or
+                "short_run"), direction ("High" or "Low"), first and last index, first
+                and last x-value, and number of points. Rows are sorted by first index.
+        """
+        if self._signal_events is None:
+            starts, stops, is_high, rule = signals._signal_events(
+                self._rule_intervals()
+            )
+            ends = stops - 1
+            x_dt = self._x_Ser_dt.to_numpy()
+
+            self._signal_events = DataFrame(
+                {
+                    "rule": rule.astype(object),
+                    "direction": where(is_high, "High", "Low").astype(object),
+                    "start_idx": starts,
+                    "end_idx": ends,
+                    "start_x": x_dt[starts],
+                    "end_x": x_dt[ends],
+                    "n_points": stops - starts,
+                }
+            )
+
+        return self._signal_events
+
+    @property
+    def signal_masks(self) -> dict:
+        """
+        Per-point masks of each rule. Built the first time they are accessed and then
+            cached.
+
+        Returns:
+            dict: Boolean array for each rule ("anomaly", "long_run", "short_run",
+                "mR_anomaly"), True for each point that is part of a signal of that rule
+        """
+        if self._signal_masks is None:
+            n = self.data.shape[0]
+            self._signal_masks = {
+                name: interval_mask.interval_mask(intervals[0], intervals[1], n)
+                for name, intervals in self._rule_intervals().items()
+            }
+            mR_anomaly = zeros(n, dtype=bool)
+            mR_anomaly[self._mR_anomaly_index] = True
+            self._signal_masks["mR_anomaly"] = mR_anomaly
+
+        return self._signal_masks
+
+    @property
+    def signals(self) -> dict:
+        """
+        Signals as lists of points. This allocates a tuple per point, so it is only
+            built the first time it is accessed and then cached. See signal_events and
+            signal_masks for columnar versions.
 
         Returns:
-            Figure: XmR chart figure object
             dict: A dictionary containing the following:
                 - list: All points lying outside the limits.
                 - list: List of lists, where each sublist contains points that are part
@@ -259,89 +861,413 @@ class XmR:
                             of a "short run", which is defined as 3 out of 4 points closer
                             to the limit lines than they are to the mean/median line.
         """
+        if self._signals is None:
+            with self._profiler.stage("signal_points"):
+                x = self._signal_labels()
+                y = self._y_Ser.to_numpy()
+                self._mR_anomalies = signals._mR_anomaly_points(
+                    x, self.mR_data.to_numpy(), self._mR_anomaly_index
+                )
+                self._signals = {
+                    "anomalies": signals._anomaly_points(x, y, self._anomaly_intervals),
+                    "long_runs": signals._run_paths(x, y, self._long_run_intervals),
+                    "short_runs": signals._run_paths(x, y, self._short_run_intervals),
+                }
 
-        fig_XmR = base_traces._base_traces(
-            self._x_Ser, self._x_Ser_dt, self._y_Ser, self.mR_data
-        )
-        axis_formats = axes_formats._format_XmR_axes(
-            npl_upper=self.npl_limit_values.get("npl_upper_limit"),
-            npl_lower=self.npl_limit_values.get("npl_lower_limit"),
-            mR_upper=self.mR_limit_values.get("mR_upper_limit"),
-            y_Ser=self._y_Ser,
-            mR_data=self.mR_data,
-            sloped=self.sloped,
-        )
-        fig_XmR.layout.xaxis = axis_formats.get("x_values")
-        fig_XmR.layout.xaxis2 = axis_formats.get("x_mR")
-        fig_XmR.layout.yaxis = axis_formats.get("y_values")
-        fig_XmR.layout.yaxis2 = axis_formats.get("y_mR")
-
-        limit_line_shapes = limit_lines._create_limit_lines(
-            data=self.data,
-            y_xmr_func=self.npl_limit_values.get("y_xmr_func"),
-            npl_upper=self.npl_limit_values.get("npl_upper_limit"),
-            npl_lower=self.npl_limit_values.get("npl_lower_limit"),
-            mR=self.mR_limit_values.get("mR_xmr_func"),
-            mR_upper=self.mR_limit_values.get("mR_upper_limit"),
-            sloped=self.sloped,
-        )
-        fig_XmR.layout.shapes = limit_line_shapes
-
-        limit_line_annotations = annotations._create_limit_line_annotations(
-            data=self.data,
-            chart_title=self._title,
-            y_xmr_func=self.npl_limit_values.get("y_xmr_func"),
-            mR_upper=self.mR_limit_values.get("mR_upper_limit"),
-            mR_xmr_func=self.mR_limit_values.get("mR_xmr_func"),
-            npl_upper=self.npl_limit_values.get("npl_upper_limit"),
-            npl_lower=self.npl_limit_values.get("npl_lower_limit"),
-            y_name=self._y_ser_name,
-            sloped=self.sloped,
-        )
-        fig_XmR.layout.annotations = limit_line_annotations
-
-        fig_XmR, anomalies = signals._anomalies(
-            fig=fig_XmR,
-            npl_upper=self.npl_limit_values.get("npl_upper_limit"),
-            npl_lower=self.npl_limit_values.get("npl_lower_limit"),
-            mR_upper=self.mR_limit_values.get("mR_upper_limit"),
-            sloped=self.sloped,
-        )
+        return self._signals
 
-        long_run_shapes, long_runs = signals._long_run_test(
-            fig=fig_XmR,
-            y_xmr_func=self.npl_limit_values.get("y_xmr_func"),
-            sloped=self.sloped,
-        )
 
-        short_run_shapes, short_runs = signals._short_run_test(
-            fig_XmR,
-            npl_upper=self.npl_limit_values.get("npl_upper_limit"),
-            npl_lower=self.npl_limit_values.get("npl_lower_limit"),
-            y_xmr_func=self.npl_limit_values.get("y_xmr_func"),
-            sloped=self.sloped,
+class XmR(XmRStats):
+    """
+    A class representing an XmR chart. Limits and signals are calculated when the object
+    is created; the Plotly figure is only built when xmr_chart is first accessed.
+
+    Attributes:
+        data (str): Dataframe to use for XmR chart.
+        y_ser_name (int): Name of column containing values to plot on y-axis.
+        x_ser_name (str): Name of column or index containing values to plot on x-axis.
+            Column or index should represent a date or date/time
+        x_cutoff (str): Value of x_ser_name, after which the data is excluded for purposes
+            of calculating limits. If None, all data is included.
+        date_part_resolution (str): Level of resolution to show on x-axis. This must match your data.
+            Valid options:
+            - year
+            - quarter
+            - month
+            - day
+            - hour
+            - minute
+            - custom
+        title (str): Custom chart title
+        sloped (bool): Use sloping approach for limit values. Only use this if your data
+            is expected to increase over time (e.g., energy prices).
+        xmr_function (str): Use "mean" or "median" function for calculating limit values
+        window (int|str): Number of most recent baseline points the limits at each point
+            are calculated from, "expanding" for every baseline point so far, or None.
+        phases (list): x-values at which a new phase, with its own limits, starts. If
+            detected automatically, the chosen x-values.
+        phase_limits (DataFrame): If phases are set, one row per phase with its first
+            x-value and limits. Otherwise None.
+        chart_height (int): Adjust chart height
+        render_mode (str): "svg", "webgl" or "auto"
+        max_points (int): Maximum number of points to draw before downsampling
+        profile_stats (dict): If profiling, the time and peak memory of each stage and
+            counters describing the input and figure. Otherwise None.
+    """
+
+    def __init__(
+        self,
+        data: DataFrame,
+        y_ser_name: str,
+        x_ser_name: str,
+        x_begin: str = None,
+        x_cutoff: str = None,
+        date_part_resolution: str = "month",
+        custom_date_part: str = "",
+        title: str = None,
+        sloped: bool = False,
+        xmr_function: str = "mean",
+        window: int | str = None,
+        phases: list = None,
+        cache: lru_cache.LRUCache | disk_cache.DiskCache = None,
+        chart_height: int = None,
+        render_mode: str = "auto",
+        max_points: int = None,
+        profile: bool = False,
+        profile_memory: bool = False,
+        profile_callback: Callable[[dict], None] = None,
+    ) -> None:
+        """
+        Initializes an XmR Chart object.
+
+        Parameters:
+            data (str): Dataframe to use for XmR chart.
+            y_ser_name (int): Name of column containing values to plot on y-axis.
+            x_ser_name (str): Name of column or index containing values to plot on x-axis.
+                Column or index should represent a date, date/time, or a proxy for such
+                (e.g., increasing integer value)
+            x_begin (str): Value of x_ser_name, before which the data is excluded for purposes
+                of calculating limits. If None, minimum value is set.
+            x_cutoff (str): Value of x_ser_name, after which the data is excluded for purposes
+                of calculating limits. If None, maximum value is set.
+            date_part_resolution (str): Resolution of your data, for formatting the x-axis. Valid options:
+                - year
+                - month
+                - day
+                - hour
+                - minute
+                - custom
+            custom_date_part (str): If you choose custom, please specify the d3 format corresponding to your data.
+            title (str): Custom chart title
+            sloped (bool): Use sloping approach for limit values. Only use this if your data
+                is expected to increase over time (e.g., energy prices).
+            xmr_function (str): Use "mean" or "median" function for calculating limit values
+            window (int|str): If set, the limits are recalculated at every point from
+                the most recent baseline points, giving limit values with one value per
+                point. An integer uses that many points (at least 2), and "expanding"
+                uses every baseline point so far. Points before x_begin have no limits,
+                and the limits are frozen after x_cutoff, as in XmRStream. Can not be
+                combined with sloped.
+            phases (list): Values of x_ser_name, formatted like x_begin, at which a new
+                phase starts (e.g., after a known change to the process). Each phase's
+                limits are calculated from its own points between x_begin and x_cutoff,
+                and runs do not cross phases. A phase without such points keeps the
+                limits of the previous phase. All phases are calculated in one pass, and
+                the limit values have one value per point. Can not be combined with
+                sloped or window.
+                If "auto", phases start where the level of the process shifts, detected
+                with utils.changepoints. The detected x-values are stored in phases.
+            cache (LRUCache|DiskCache): If set, the limits and signals are stored in the
+                cache, keyed by a fingerprint of the x- and y-values and the parameters,
+                and reused by any later chart built from the same values and
+                parameters. to_json also caches the figure JSON.
+            chart_height (int): Adjust chart height
+            render_mode (str): Use "svg" (Scatter) or "webgl" (Scattergl) traces for the
+                data points and anomaly markers. WebGL keeps charts with many points
+                interactive. If "auto", WebGL is used above webgl_point_threshold
+                points.
+            max_points (int): If set (at least 3), series with more points are
+                downsampled to about this many points before drawing, using
+                Largest-Triangle-Three-Buckets.
+                Every point that is part of an anomaly, long run or short run is kept.
+                Limits and signals are always calculated from all points.
+            profile (bool): Record the wall time of each stage, including the stages
+                of building the figure, and counters such as the number of points,
+                runs and shapes in profile_stats. Results are logged to the
+                "spc_plotly.xmr" logger at INFO level.
+            profile_memory (bool): Also record the peak memory allocated by each stage,
+                using tracemalloc. Implies profile.
+            profile_callback (callable): Called with profile_stats once the limits and
+                signals are calculated, and again once the figure is built. Implies
+                profile.
+        """
+
+        # Chart options are validated before the limits are calculated
+        validation.validate_render_mode_val(render_mode, render_modes)
+        validation.validate_max_points_val(max_points)
+
+        super().__init__(
+            data=data,
+            y_ser_name=y_ser_name,
+            x_ser_name=x_ser_name,
+            x_begin=x_begin,
+            x_cutoff=x_cutoff,
+            date_part_resolution=date_part_resolution,
+            custom_date_part=custom_date_part,
+            sloped=sloped,
+            xmr_function=xmr_function,
+            window=window,
+            phases=phases,
+            cache=cache,
+            profile=profile,
+            profile_memory=profile_memory,
+            profile_callback=profile_callback,
         )
 
-        fig_XmR = menus._menu(
-            fig=fig_XmR,
-            limit_lines=limit_line_shapes,
-            limit_line_annotations=limit_line_annotations,
-            long_run_shapes=long_run_shapes,
-            short_run_shapes=short_run_shapes,
+        self._title = (
+            f"{y_ser_name} XmR Chart by {self._x_ser_name}" if title is None else title
         )
+        self._height = chart_height
 
-        fig_XmR.update_layout(
-            plot_bgcolor="white",
-            font={"size": 10},
-            showlegend=False,
-            height=self._height,
-            hovermode="x",
+        self.render_mode = render_mode.lower()
+        self._webgl = self.render_mode == "webgl" or (
+            self.render_mode == "auto" and self.data.shape[0] > webgl_point_threshold
         )
 
-        signals_dict = {
-            "anomalies": anomalies,
-            "long_runs": long_runs,
-            "short_runs": short_runs,
-        }
+        self.max_points = max_points
+        self._xmr_chart = None
+
+    @property
+    def xmr_chart(self) -> "Figure":
+        """
+        XmR chart figure object. The figure, including its shapes, annotations and menu,
+            is built the first time it is accessed and then cached.
+
+        Returns:
+            Figure: XmR chart figure object
+        """
+        if self._xmr_chart is None:
+            self._xmr_chart = self._XmR_chart()
+
+        return self._xmr_chart
+
+    def to_json(self, typed_arrays: bool = None) -> str:
+        """
+        Serializes the XmR chart figure to JSON, reading the figure's properties
+            directly instead of copying and cleaning them as Figure.to_json does.
+            orjson is used if installed, following plotly.io.json.config. If a cache
+            is set, the JSON is stored in the cache, keyed by the fingerprint of the
+            limits and signals, the chart options and the Plotly version, and a hit
+            skips building the figure.
+
+        Parameters:
+            typed_arrays (bool): If True, the y-values, moving ranges and anomalies are
+                written as base64 typed arrays, which plotly.js 2.28 and later decode
+                and which are several times smaller than lists of numbers. If False,
+                they are written as lists for older versions of plotly.js. If None,
+                the installed version of Plotly decides (typed arrays from Plotly 6).
+
+        Returns:
+            str: Figure JSON, identical to xmr_chart.to_json() if typed_arrays is None
+        """
+        key = None
+        if self._cache is not None:
+            with self._profiler.stage("cache_lookup"):
+                key = fingerprint.fingerprint(
+                    [],
+                    {
+                        "stats": self._cache_key,
+                        "title": self._title,
+                        "height": self._height,
+                        "webgl": self._webgl,
+                        "max_points": self.max_points,
+                        "y_ser_name": str(self._y_ser_name),
+                        "x_ser_name": str(self._x_ser_name),
+                        "plotly": disk_cache._package_version("plotly"),
+                        "typed_arrays": typed_arrays,
+                    },
+                )
+                result = self._cache.get(key)
+            if result is not None:
+                return result
+
+        from spc_plotly.helpers import figure_json
+
+        fig = self.xmr_chart
+        with self._profiler.stage("to_json"):
+            result = figure_json._figure_json(fig, typed_arrays)
+        if self._cache is not None:
+            self._cache.put(key, result)
+
+        return result
+
+    def _render_index(self) -> ndarray | None:
+        """
+        Selects the points to draw when the series is longer than max_points
+
+        Returns:
+            ndarray|None: Sorted index of the points to draw, or None to draw every
+                point
+        """
+        n = self.data.shape[0]
+        if self.max_points is None or n <= self.max_points:
+            return None
+
+        # Keep every point that is part of a signal so the signal shapes line up
+        keep = self._signal_index()
+
+        return lttb.lttb(self._y_Ser.to_numpy(), self.max_points, keep=keep)
+
+    def _XmR_chart(self) -> "Figure":
+        """
+        Creates the XmR chart from the previously calculated limits and signals
+
+        Returns:
+            Figure: XmR chart figure object
+        """
+        # Figure helpers import Plotly, so they are only loaded when a chart is built
+        with self._profiler.stage("import_plotly"):
+            from spc_plotly.helpers import (
+                axes_formats,
+                base_traces,
+                limit_lines,
+                annotations,
+                menus,
+            )
+
+        with self._profiler.stage("labels"):
+            x_Ser, x_Ser_dt, y_Ser, mR_data = (
+                self._x_Ser,
+                self._x_Ser_dt,
+                self._y_Ser,
+                self.mR_data,
+            )
+
+        with self._profiler.stage("downsample"):
+            render_index = self._render_index()
+            if render_index is not None:
+                x_Ser, x_Ser_dt, y_Ser, mR_data = (
+                    x_Ser.take(render_index),
+                    x_Ser_dt.take(render_index),
+                    y_Ser.take(render_index),
+                    mR_data.take(render_index),
+                )
+
+        with self._profiler.stage("base_traces"):
+            fig_XmR = base_traces._base_traces(
+                x_Ser, x_Ser_dt, y_Ser, mR_data, webgl=self._webgl
+            )
+
+        with self._profiler.stage("axes"):
+            axis_formats = axes_formats._format_XmR_axes(
+                npl_upper=self.npl_limit_values.get("npl_upper_limit"),
+                npl_lower=self.npl_limit_values.get("npl_lower_limit"),
+                mR_upper=self.mR_limit_values.get("mR_upper_limit"),
+                y_Ser=self._y_Ser,
+                mR_data=self.mR_data,
+                sloped=self.sloped,
+                per_point=self.window is not None or self._phase is not None,
+            )
+            fig_XmR.layout.xaxis = axis_formats.get("x_values")
+            fig_XmR.layout.xaxis2 = axis_formats.get("x_mR")
+            fig_XmR.layout.yaxis = axis_formats.get("y_values")
+            fig_XmR.layout.yaxis2 = axis_formats.get("y_mR")
+
+        with self._profiler.stage("limit_lines"):
+            # Limits calculated over a window are drawn as traces, after the signals
+            if self._phase is not None:
+                phase_starts = self.phase_limits["start_x"]
+                x_starts = phase_starts.dt.strftime(self.custom_date_part).to_list()
+                fig_XmR.layout.shapes = limit_lines._phase_limit_lines(
+                    x_starts=x_starts,
+                    x_ends=x_starts[1:]
+                    + [self._x_Ser_dt.max().strftime(self.custom_date_part)],
+                    y_xmr_func=self.phase_limits["y_xmr_func"].to_numpy(),
+                    npl_upper=self.phase_limits["npl_upper_limit"].to_numpy(),
+                    npl_lower=self.phase_limits["npl_lower_limit"].to_numpy(),
+                    mR=self.phase_limits["mR_xmr_func"].to_numpy(),
+                    mR_upper=self.phase_limits["mR_upper_limit"].to_numpy(),
+                )
+            elif self.window is None:
+                fig_XmR.layout.shapes = limit_lines._create_limit_lines(
+                    data=self.data,
+                    y_xmr_func=self.npl_limit_values.get("y_xmr_func"),
+                    npl_upper=self.npl_limit_values.get("npl_upper_limit"),
+                    npl_lower=self.npl_limit_values.get("npl_lower_limit"),
+                    mR=self.mR_limit_values.get("mR_xmr_func"),
+                    mR_upper=self.mR_limit_values.get("mR_upper_limit"),
+                    sloped=self.sloped,
+                )
+
+        with self._profiler.stage("annotations"):
+            limit_line_annotations = annotations._create_limit_line_annotations(
+                data=self.data,
+                chart_title=self._title,
+                y_xmr_func=self.npl_limit_values.get("y_xmr_func"),
+                mR_upper=self.mR_limit_values.get("mR_upper_limit"),
+                mR_xmr_func=self.mR_limit_values.get("mR_xmr_func"),
+                npl_upper=self.npl_limit_values.get("npl_upper_limit"),
+                npl_lower=self.npl_limit_values.get("npl_lower_limit"),
+                y_name=self._y_ser_name,
+                sloped=self.sloped,
+                per_point=self.window is not None or self._phase is not None,
+            )
+            fig_XmR.layout.annotations = limit_line_annotations
+
+        # Building the signal points also sets the moving range anomaly points
+        signal_points = self.signals
+
+        with self._profiler.stage("signal_traces"):
+            fig_XmR = signals._anomalies(
+                fig=fig_XmR,
+                anomaly_points=signal_points.get("anomalies"),
+                mR_anomaly_points=self._mR_anomalies,
+                webgl=self._webgl,
+            )
+
+            fig_XmR = signals._long_run_test(
+                fig=fig_XmR,
+                long_runs=signal_points.get("long_runs"),
+                webgl=self._webgl,
+            )
+
+            fig_XmR = signals._short_run_test(
+                fig=fig_XmR,
+                short_runs=signal_points.get("short_runs"),
+                webgl=self._webgl,
+            )
+
+        if self.window is not None:
+            with self._profiler.stage("limit_lines"):
+                limit_values = [
+                    self.npl_limit_values.get("y_xmr_func"),
+                    self.npl_limit_values.get("npl_upper_limit"),
+                    self.npl_limit_values.get("npl_lower_limit"),
+                    self.mR_limit_values.get("mR_xmr_func"),
+                    self.mR_limit_values.get("mR_upper_limit"),
+                ]
+                if render_index is not None:
+                    limit_values = [values[render_index] for values in limit_values]
+
+                fig_XmR = limit_lines._limit_line_traces(
+                    fig_XmR, x_Ser, *limit_values, webgl=self._webgl
+                )
+
+        with self._profiler.stage("layout"):
+            fig_XmR = menus._menu(fig=fig_XmR)
+
+            fig_XmR.update_layout(
+                plot_bgcolor="white",
+                font={"size": 10},
+                showlegend=False,
+                height=self._height,
+                hovermode="x",
+            )
+
+        self._profiler.count("n_rendered_points", y_Ser.shape[0])
+        self._profiler.count("n_traces", len(fig_XmR.data))
+        self._profiler.count("n_shapes", len(fig_XmR.layout.shapes))
+        self._profiler.count("n_annotations", len(fig_XmR.layout.annotations))
+        self._report_profile()
 
-        return fig_XmR, signals_dict
+        return fig_XmR
@@ -1,87 +1,924 @@
-from pandas import to_datetime
+import base64
+import json
+import os
+import subprocess
+import sys
+import time
 
+import numpy as np
+import pytest
+from pandas import DataFrame, Series, concat, date_range
 
-def test_inputs(XmR, date_parts) -> bool:
+from spc_plotly import batch, parallel, stream, validation, xmr
+from spc_plotly.helpers import signals
+from spc_plotly.utils import (
+    baseline_index,
+    changepoints,
+    disk_cache,
+    lru_cache,
+    merge_intervals,
+    phase_index,
+    running_median,
+)
 
-    test_xmr_func_val(XmR.xmr_function)
-    test_sloped_val(XmR.sloped)
-    test_date_part_resolution_val(XmR.date_part_resolution, date_parts)
-    test_custom_date_part_val(XmR.date_part_resolution, XmR.custom_date_part)
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-    return True
+counts = [2478, 2350, 2485, 2296, 2359, 2567, 3089, 2668, 1788, 2854, 2365, 1883]
+data = DataFrame(
+    {
+        "Period": date_range("2023-01-01", periods=len(counts), freq="MS"),
+        "Count": counts,
+    }
+)
 
 
-def test_xmr_func_val(xmr_func_val):
-    if xmr_func_val.lower() not in ["mean", "median"]:
-        e = f"{xmr_func_val} not a valid xmr function option. Must be 'mean' or 'median'"
-        raise ValueError(e)
+def test_import_does_not_load_plotly():
+    code = (
+        "import sys\n"
+        "import spc_plotly.xmr, spc_plotly.batch\n"
+        "import spc_plotly.stream, spc_plotly.parallel\n"
+        "assert 'plotly' not in sys.modules, 'plotly imported'\n"
+        "assert 'tests' not in sys.modules, 'tests imported'\n"
+    )
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    result = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
 
-    return True
+    assert result.returncode == 0, result.stderr
 
 
-def test_date_part_resolution_val(date_part_resolution_val, date_parts):
-    if date_part_resolution_val.lower() not in date_parts.keys():
-        vals = list(date_parts.keys())
-        e = f"{date_part_resolution_val} not a valid date part resolution. Must be {vals}"
-        raise ValueError(e)
+def test_stats_without_figure():
+    stats = xmr.XmRStats(
+        data=data, y_ser_name="Count", x_ser_name="Period", x_cutoff="2023-06"
+    )
 
-    return True
+    assert stats.x_begin == "2023-01"
+    assert stats.data_for_limits.shape[0] == 6
+    assert set(stats.signals) == {"anomalies", "long_runs", "short_runs"}
 
 
-def test_custom_date_part_val(date_part_resolution_val, custom_date_part_val):
-    if date_part_resolution_val == "custom":
-        if custom_date_part_val is None or custom_date_part_val == "":
-            e = "Must specify a valid date part format. Please visit https://d3js.org/d3-time-format for reference."
-            raise ValueError(e)
+def test_chart_builds_figure():
+    chart = xmr.XmR(data=data, y_ser_name="Count", x_ser_name="Period")
 
-    return True
+    assert len(chart.xmr_chart.data) == 6
 
 
-def test_x_ser_name_val(x_ser_name, data):
-    if x_ser_name in data.columns or x_ser_name == data.index.name:
-        return True
-    else:
-        e = f"{x_ser_name} not a valid column or index in your dataframe"
-        raise ValueError(e)
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"xmr_function": "mode"},
+        {"date_part_resolution": "week"},
+        {"date_part_resolution": "custom"},
+        {"x_cutoff": "2030-01"},
+        {"x_begin": "2023-1"},
+        {"sloped": "yes"},
+        {"window": 1},
+        {"window": "rolling"},
+        {"window": 4, "sloped": True},
+        {"phases": "2023-06"},
+        {"phases": ["2023-13"]},
+        {"phases": ["2023-06"], "window": 4},
+    ],
+)
+def test_invalid_inputs(kwargs):
+    with pytest.raises(ValueError):
+        xmr.XmRStats(data=data, y_ser_name="Count", x_ser_name="Period", **kwargs)
 
 
-def test_x_ser_is_date(x_Ser):
+def test_invalid_bounds_do_not_print(capsys):
+    with pytest.raises(ValueError):
+        xmr.XmRStats(
+            data,
+            "Count",
+            "Period",
+            date_part_resolution="custom",
+            custom_date_part="%Y-%m",
+            x_cutoff="2030-01",
+        )
+
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.parametrize("max_points", [0, 2, -5, 2.5, True, "100"])
+def test_invalid_max_points(max_points):
+    with pytest.raises(ValueError):
+        xmr.XmR(
+            data=data, y_ser_name="Count", x_ser_name="Period", max_points=max_points
+        )
+
+
+def test_downsampling_keeps_signal_points():
+    long_data = _sloped_series(5000)
+    long_data["y"] = long_data["y"] % 97
+    chart = xmr.XmR(long_data, "y", "t", date_part_resolution="minute", max_points=200)
+    signal_index = chart._signal_index()
+    drawn = chart.xmr_chart.data[0]
+
+    assert len(signal_index) > 0
+    assert len(drawn.x) < len(long_data)
+    assert len(drawn.x) <= 200 + len(signal_index)
+    assert set(chart._x_Ser.iloc[signal_index]) <= set(drawn.x)
+
+
+def test_invalid_columns():
+    with pytest.raises(ValueError):
+        validation.validate_y_ser_name_val("Missing", data)
+    with pytest.raises(ValueError):
+        validation.validate_x_ser_name_val("Missing", data)
+
+
+def test_invalid_render_mode():
+    with pytest.raises(ValueError):
+        validation.validate_render_mode_val("canvas", xmr.render_modes)
+
+
+def _run_series() -> DataFrame:
+    # Baseline of 20 points alternating around a mid line of 100, with limits 73.4 and
+    #   126.6, followed by runs of each rule
+    y = [105, 95] * 10 + (
+        [105] * 8  # long run of 8 points
+        + [95, 120, 95, 120, 120]  # short run of one window
+        + [95, 95, 105]
+        + [95] * 12  # long run that keeps growing
+        + [105, 120, 120, 120, 120, 120, 120, 80]  # short run of several windows
+        + [95, 105]
+    )
+    return DataFrame(
+        {"Period": date_range("2020-01-01", periods=len(y), freq="MS"), "Value": y}
+    )
+
+
+@pytest.mark.parametrize(
+    "render_mode, threshold, expected",
+    [
+        ("svg", 5, "scatter"),
+        ("webgl", 5000, "scattergl"),
+        ("auto", 5, "scattergl"),
+        ("auto", 5000, "scatter"),
+    ],
+)
+def test_render_mode_trace_types(render_mode, threshold, expected, monkeypatch):
+    monkeypatch.setattr(xmr, "webgl_point_threshold", threshold)
+    fig = xmr.XmR(
+        _run_series(), "Value", "Period", x_cutoff="2021-08", render_mode=render_mode
+    ).xmr_chart
+
+    assert {trace.type for trace in fig.data} == {expected}
+
+    # Runs are filled polygons separated by gaps, which Scattergl also splits on
+    run_traces = [
+        trace for trace in fig.data if trace.name in ("Long Run", "Short Run")
+    ]
+    assert len(run_traces) == 2
+    for trace in run_traces:
+        assert trace.fill == "toself"
+        assert trace.line.dash == "longdashdot"
+        assert np.isnan(trace.y).sum() == 2
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"window": 4}])
+def test_menu_only_toggles_traces(kwargs):
+    quiet = xmr.XmR(data, "Count", "Period", **kwargs).xmr_chart
+    runs = xmr.XmR(
+        _run_series(), "Value", "Period", x_cutoff="2021-08", **kwargs
+    ).xmr_chart
+
+    # Shapes are the limit lines only, not a copy per signal
+    assert len(runs.layout.shapes) == len(quiet.layout.shapes)
+    assert not any(shape.type == "path" for shape in runs.layout.shapes)
+
+    for fig in (quiet, runs):
+        (menu,) = fig.layout.updatemenus
+        assert len(menu.buttons) == 5
+        for button in menu.buttons:
+            assert button.method == "restyle"
+            assert len(button.args) == 1
+            assert list(button.args[0]) == ["visible"]
+            assert len(button.args[0]["visible"]) == len(fig.data)
+
+    # The menu does not grow with the number of signals
+    assert runs.layout.updatemenus == quiet.layout.updatemenus
+
+
+def test_profile_stats():
+    reports = []
+    chart = xmr.XmR(
+        data=data,
+        y_ser_name="Count",
+        x_ser_name="Period",
+        profile_memory=True,
+        profile_callback=reports.append,
+    )
+
+    assert {"parse_dates", "limits", "short_runs"} <= set(chart.profile_stats["stages"])
+    assert chart.profile_stats["counters"]["n_points"] == len(counts)
+    assert len(reports) == 1
+
+    chart.xmr_chart
+    assert "base_traces" in chart.profile_stats["stages"]
+    assert "peak_memory" in chart.profile_stats["stages"]["base_traces"]
+    assert chart.profile_stats["counters"]["n_traces"] == 6
+    assert len(reports) == 2
+
+    assert xmr.XmRStats(data, "Count", "Period").profile_stats is None
+
+
+def test_signal_events_match_signals():
+    stats = xmr.XmRStats(data, "Count", "Period", x_cutoff="2023-06")
+    events = stats.signal_events
+    masks = stats.signal_masks
+
+    long_runs = events[events["rule"] == "long_run"]
+    assert list(long_runs["n_points"]) == [len(r) for r in stats.signals["long_runs"]]
+    assert masks["long_run"].sum() == long_runs["n_points"].sum()
+    assert (events["rule"] == "anomaly").sum() == len(stats.signals["anomalies"])
+    assert list(events.columns) == [
+        "rule",
+        "direction",
+        "start_idx",
+        "end_idx",
+        "start_x",
+        "end_x",
+        "n_points",
+    ]
+
+
+def _metrics(n_metrics: int = 12, seed: int = 0) -> DataFrame:
+    # Metrics of different lengths, some trending and some with a shift, shuffled
+    rng = np.random.default_rng(seed)
+    frames = []
+    for metric in range(n_metrics):
+        n = int(rng.integers(24, 48))
+        i = np.arange(n)
+        values = 1000 + (5 * i if metric % 3 == 0 else 0) + rng.normal(0, 50, n)
+        if metric % 3 == 1:
+            values[n // 2 :] += 300
+        frames.append(
+            DataFrame(
+                {
+                    "metric": f"m{metric:02d}",
+                    "period": date_range("2018-01-01", periods=n, freq="MS"),
+                    "value": values.round(),
+                }
+            )
+        )
+    return concat(frames).sample(frac=1, random_state=seed, ignore_index=True)
+
+
+@pytest.mark.parametrize("sloped", [False, True])
+@pytest.mark.parametrize("xmr_function", ["mean", "median"])
+@pytest.mark.parametrize("bounds", [{}, {"x_begin": "2018-03", "x_cutoff": "2019-06"}])
+def test_batch_matches_per_metric_stats(sloped, xmr_function, bounds):
+    metrics = _metrics()
+    kwargs = dict(sloped=sloped, xmr_function=xmr_function, **bounds)
+    metric_batch = batch.XmRBatch(metrics, "metric", "value", "period", **kwargs)
+    limits = metric_batch.limits.set_index("metric")
+    columns = ["rule", "direction", "start_idx", "end_idx", "start_x", "n_points"]
+
+    assert len(metric_batch.signals) > 0
+    for metric, rows in metrics.groupby("metric"):
+        stats = xmr.XmRStats(rows.sort_values("period"), "value", "period", **kwargs)
+        row = limits.loc[metric]
+        assert row["mR_upper_limit"] == pytest.approx(
+            stats.mR_limit_values["mR_upper_limit"]
+        )
+        if sloped:
+            mid = (np.arange(len(rows)) + 1) * row["slope"] + row["intercept"]
+            assert mid == pytest.approx(stats.npl_limit_values["y_xmr_func"])
+        else:
+            assert row["npl_upper_limit"] == pytest.approx(
+                stats.npl_limit_values["npl_upper_limit"]
+            )
+            assert row["npl_lower_limit"] == pytest.approx(
+                stats.npl_limit_values["npl_lower_limit"]
+            )
+
+        signals = metric_batch.signals[metric_batch.signals["metric"] == metric]
+        expected = stats.signal_events[columns].sort_values(["rule", "start_idx"])
+        signals = signals[columns].sort_values(["rule", "start_idx"])
+        assert signals.to_dict("records") == expected.to_dict("records")
+
+
+def test_batch_invalid_group_column():
+    with pytest.raises(ValueError, match="Missing not a valid group column"):
+        batch.XmRBatch(_metrics(), "Missing", "value", "period")
+
+
+def test_batch_metric_without_baseline():
+    metrics = _metrics(3)
+    short = metrics["metric"] == "m01"
+    metrics = metrics[~short | (metrics["period"] < "2018-06-01")]
+
+    with pytest.raises(ValueError, match=r"for \['m01'\]"):
+        batch.XmRBatch(metrics, "metric", "value", "period", x_begin="2019-01")
+
+
+def test_batch_figure():
+    metrics = _metrics()
+    metric_batch = batch.XmRBatch(metrics, "metric", "value", "period")
+    fig = metric_batch.figure("m01")
+    chart = xmr.XmR(
+        metrics[metrics["metric"] == "m01"].sort_values("period"),
+        "value",
+        "period",
+    )
+
+    assert len(fig.data) == len(chart.xmr_chart.data)
+    assert list(fig.data[0].y) == list(chart.xmr_chart.data[0].y)
+    assert set(metric_batch.figures(["m00", "m02"])) == {"m00", "m02"}
+
+
+def test_build_charts_in_parallel():
+    x = data["Period"].to_numpy()
+    series = [(x, [count + offset for count in counts]) for offset in range(7)]
+    series[3] = (x, ["not a number"] * len(counts))
+    titles = [f"Chart {i}" for i in range(len(series))]
+
+    results = parallel.build_charts(
+        series, titles=titles, x_ser_name="Period", workers=2, chunksize=3
+    )
+
+    assert len(results) == len(series)
+    assert results[3]["error"] is not None and results[3]["xmr_chart"] is None
+    for i, result in enumerate(results):
+        if i == 3:
+            continue
+        assert result["error"] is None
+        # The title is drawn as the first annotation
+        annotations = json.loads(result["xmr_chart"])["layout"]["annotations"]
+        assert annotations[0]["text"] == titles[i]
+        expected = xmr.XmRStats(
+            DataFrame({"Period": x, "y": series[i][1]}), "y", "Period"
+        )
+        assert result["npl_limit_values"]["npl_upper_limit"] == pytest.approx(
+            expected.npl_limit_values["npl_upper_limit"]
+        )
+
+
+def _intervals(windows: tuple) -> list:
+    return list(zip(*(w.tolist() for w in windows)))
+
+
+@pytest.mark.parametrize(
+    "window, first, expected_starts, expected_counts",
+    [
+        (3, None, [0, 0, 0, 1, 2, 3], [1, 2, 2, 2, 2, 3]),
+        # Windows longer than the series are truncated at its start
+        (10, None, [0, 0, 0, 0, 0, 0], [1, 2, 2, 3, 4, 5]),
+        # Windows never cross into the previous series
+        (3, [0, 0, 0, 3, 3, 3], [0, 0, 0, 3, 3, 3], [1, 2, 2, 1, 2, 3]),
+    ],
+)
+def test_trailing_counts(window, first, expected_starts, expected_counts):
+    test = np.array([True, True, False, True, True, True])
+    first = None if first is None else np.array(first)
+    starts, counts = signals._trailing_counts(test, window, first)
+
+    assert starts.tolist() == expected_starts
+    assert counts.tolist() == expected_counts
+
+
+def test_long_run_windows():
+    y = np.array([1.0] * 9 + [-1.0] * 8)
+
+    # Every trailing window of 8 points on one side of the mid line
+    assert _intervals(signals._long_run_windows(y, 0.0)) == [
+        (0, 8, True),
+        (1, 9, True),
+        (9, 17, False),
+    ]
+    # Series shorter than the window
+    assert _intervals(signals._long_run_windows(y[:7], 0.0)) == []
+    # Points on a missing mid line are on neither side
+    center = np.zeros(len(y))
+    center[4] = np.nan
+    assert _intervals(signals._long_run_windows(y, center)) == [(9, 17, False)]
+    assert _intervals(signals._long_run_windows(y, np.nan)) == []
+    # Windows never cross into the next series
+    first = np.array([0] * 5 + [5] * 12)
+    assert _intervals(signals._long_run_windows(y, 0.0, first)) == [(9, 17, False)]
+
+
+def test_short_run_windows():
+    # Mid-ranges at 5 and -5
+    y = np.array([6.0, 6.0, 0.0, 6.0, 0.0, 0.0, -6.0, -6.0, -6.0])
+
+    assert _intervals(signals._short_run_windows(y, 10.0, -10.0, 0.0)) == [
+        (0, 4, True),
+        (5, 9, False),
+    ]
+    # Windows at the start of a series are truncated, so 3 points can be a short run
+    assert _intervals(signals._short_run_windows(y[:2], 10.0, -10.0, 0.0)) == []
+    assert _intervals(signals._short_run_windows(y[6:], 10.0, -10.0, 0.0)) == [
+        (0, 3, False)
+    ]
+    # Points compared with a missing limit are not closer to it
+    upper = np.full(len(y), 10.0)
+    upper[1] = np.nan
+    assert _intervals(signals._short_run_windows(y, upper, -10.0, 0.0)) == [
+        (5, 9, False)
+    ]
+    assert _intervals(signals._short_run_windows(y, np.nan, np.nan, np.nan)) == []
+
+
+@pytest.mark.parametrize(
+    "intervals, expected",
+    [
+        # Overlapping intervals merge, touching intervals do not
+        ([(0, 4), (2, 6), (6, 8)], [(0, 6, 0), (6, 8, 0)]),
+        # Nested and unsorted intervals
+        ([(5, 9), (0, 3), (6, 7), (1, 2)], [(0, 3, 0), (5, 9, 0)]),
+        # Only intervals with the same key merge
+        ([(0, 4, 1), (2, 6, 0), (3, 8, 1)], [(0, 8, 1), (2, 6, 0)]),
+        ([(4, 8, True), (0, 5, False), (6, 9, True)], [(0, 5, 0), (4, 9, 1)]),
+    ],
+)
+def test_merge_intervals(intervals, expected):
+    starts, stops, *keys = zip(*intervals)
+    merged = merge_intervals.merge_intervals(starts, stops, *keys)
+
+    assert list(zip(*(m.tolist() for m in merged))) == expected
+
+
+def test_merge_intervals_empty():
+    starts, stops, keys = merge_intervals.merge_intervals([], [])
+
+    assert starts.shape == stops.shape == keys.shape == (0,)
+
+
+def _reference_baseline(x_dt, x_begin, x_cutoff, date_format) -> np.ndarray:
+    # Mask-based lookup used before the binary search: every x-value is formatted and
+    #   the bounds are compared with the labels as strings
+    labels = Series(x_dt).dt.strftime(date_format)
+    for bound in (x_begin, x_cutoff):
+        if bound is not None and bound not in labels.values:
+            raise ValueError(f"{bound} not present")
+    mask = np.ones(len(labels), dtype=bool)
+    if x_begin is not None:
+        mask &= (labels >= x_begin).to_numpy()
+    if x_cutoff is not None:
+        mask &= (labels <= x_cutoff).to_numpy()
+    return mask
+
+
+def _as_mask(index, n: int) -> np.ndarray:
+    mask = np.zeros(n, dtype=bool)
+    mask[index] = True
+    return mask
+
+
+# Several points per month, from 2020-01 to 2021-05
+baseline_x = date_range("2020-01-01 07:00", periods=100, freq="5D")
+
+
+@pytest.mark.parametrize("shuffled", [False, True])
+@pytest.mark.parametrize(
+    "x_begin, x_cutoff",
+    [
+        (None, None),
+        ("2020-03", None),
+        (None, "2021-02"),
+        ("2020-03", "2021-02"),
+        ("2020-05", "2020-05"),
+        ("2021-02", "2020-03"),
+        # Outside the data range
+        ("2019-12", None),
+        (None, "2021-06"),
+        # Labels that do not parse, or do not format back to themselves
+        ("March 2020", None),
+        ("2020-13", None),
+        (None, "2020-3"),
+        (None, 202003),
+    ],
+)
+def test_baseline_index_matches_labels(x_begin, x_cutoff, shuffled):
+    x = baseline_x
+    if shuffled:
+        x = x[np.random.default_rng(0).permutation(len(x))]
+
     try:
-        to_datetime(x_Ser)
-    except:
-        e = f"{x_Ser.name} can not be converted to datetime format. Please inspect data for erroneous values."
-        raise TypeError(e)
+        expected = _reference_baseline(x, x_begin, x_cutoff, "%Y-%m")
+    except ValueError:
+        with pytest.raises(ValueError, match="not present in period"):
+            baseline_index.baseline_index(
+                x, x_begin, x_cutoff, "%Y-%m", "M", x_name="period"
+            )
+        return
+
+    index = baseline_index.baseline_index(x, x_begin, x_cutoff, "%Y-%m", "M")
+    # Unsorted x-values fall back to a mask
+    assert isinstance(index, np.ndarray if shuffled else slice)
+    np.testing.assert_array_equal(_as_mask(index, len(x)), expected)
+
+
+@pytest.mark.parametrize("shuffled", [False, True])
+@pytest.mark.parametrize(
+    "breakpoints",
+    [[], ["2020-06"], ["2021-01", "2020-06"], ["2020-01", "2020-06", "2020-06"]],
+)
+def test_phase_index_matches_labels(breakpoints, shuffled):
+    x = baseline_x
+    if shuffled:
+        x = x[np.random.default_rng(0).permutation(len(x))]
+    labels = Series(x).dt.strftime("%Y-%m").to_numpy()
+    expected = np.searchsorted(np.unique(breakpoints), labels, side="right")
+
+    np.testing.assert_array_equal(
+        phase_index.phase_index(x, breakpoints, "%Y-%m", "M"), expected
+    )
+
+
+@pytest.mark.parametrize("breakpoint", ["2019-12", "2021-06", "June 2020"])
+def test_phase_index_invalid_breakpoint(breakpoint):
+    with pytest.raises(ValueError, match="not present in period"):
+        phase_index.phase_index(baseline_x, [breakpoint], "%Y-%m", "M", "period")
+
+
+def test_baseline_with_time_zone():
+    # Points every 7 hours, so local and UTC days differ
+    x = date_range("2020-01-01", periods=40, freq="7h", tz="America/New_York")
+    points = DataFrame({"t": x, "y": np.arange(40.0)})
+    bounds = {"x_begin": "2020-01-03", "x_cutoff": "2020-01-08"}
+    expected = _reference_baseline(x.tz_localize(None), *bounds.values(), "%Y-%m-%d")
+    assert expected.sum() == 21
+
+    stats = xmr.XmRStats(points, "y", "t", date_part_resolution="day", **bounds)
+    np.testing.assert_array_equal(_as_mask(stats._baseline, len(x)), expected)
+
+    points["metric"] = "a"
+    metrics = batch.XmRBatch(
+        points, "metric", "y", "t", date_part_resolution="day", **bounds
+    )
+    np.testing.assert_array_equal(metrics._baseline, expected)
+
+
+def test_sloped_limits_are_arrays():
+    stats = xmr.XmRStats(data, "Count", "Period", sloped=True)
+    mid = stats.npl_limit_values["y_xmr_func"]
+    upper = stats.npl_limit_values["npl_upper_limit"]
+
+    assert mid.shape == (len(counts),)
+    assert upper - mid == pytest.approx(
+        [stats.mR_limit_values["mR_upper_limit"]] * len(counts)
+    )
+
+
+def _sloped_series(n: int) -> DataFrame:
+    # Trend with blocks of 10 points alternating above and below it
+    i = np.arange(n)
+    offset = np.where((i // 10) % 2 == 0, 6.0, -6.0) + np.where(i % 2 == 0, 1.0, -1.0)
+    return DataFrame(
+        {"t": date_range("2000-01-01", periods=n, freq="min"), "y": 10 + 2 * i + offset}
+    )
+
+
+def _reference_long_runs(y, center) -> list:
+    # Maximal stretches of 8+ points on one side of the mid-line, checked point by point
+    side = np.sign(y - center)
+    runs, start = [], 0
+    for i in range(1, len(y) + 1):
+        if i == len(y) or side[i] != side[start]:
+            if side[start] != 0 and i - start >= 8:
+                runs.append((start, i, "High" if side[start] > 0 else "Low"))
+            start = i
+    return runs
+
+
+@pytest.mark.parametrize("x_cutoff", [None, "2000-01-01 01:15"])
+def test_sloped_long_run_labels(x_cutoff):
+    sloped_data = _sloped_series(120)
+    stats = xmr.XmRStats(
+        sloped_data,
+        "y",
+        "t",
+        x_cutoff=x_cutoff,
+        date_part_resolution="minute",
+        sloped=True,
+    )
+    y = sloped_data["y"].to_numpy()
+    center = stats.npl_limit_values["y_xmr_func"]
+    expected = _reference_long_runs(y, center)
+
+    long_runs = stats.signals["long_runs"]
+    assert len(long_runs) == len(expected) > 0
+    for run, (start, stop, direction) in zip(long_runs, expected):
+        assert [point[1] for point in run] == list(y[start:stop])
+        assert {point[2] for point in run} == {direction}
+
+    events = stats.signal_events
+    events = events[events["rule"] == "long_run"]
+    intervals = zip(events["start_idx"], events["end_idx"] + 1, events["direction"])
+    assert list(intervals) == expected
+
+
+def test_sloped_long_runs_scale_linearly():
+    def build(n):
+        sloped_data = _sloped_series(n)
+        start = time.perf_counter()
+        xmr.XmRStats(
+            sloped_data, "y", "t", date_part_resolution="minute", sloped=True
+        ).signals
+        return time.perf_counter() - start
+
+    build(1_000)
+    small, large = build(20_000), build(200_000)
+
+    # 10x the points; a quadratic lookup would take about 100x as long
+    assert large < 30 * small + 0.5
+
+
+@pytest.mark.parametrize("xmr_function", ["mean", "median"])
+@pytest.mark.parametrize("window", [3, "expanding"])
+def test_rolling_limits_match_stream(xmr_function, window):
+    x_begin, x_cutoff = "2023-02", "2023-10"
+    stats = xmr.XmRStats(
+        data,
+        "Count",
+        "Period",
+        x_begin=x_begin,
+        x_cutoff=x_cutoff,
+        xmr_function=xmr_function,
+        window=window,
+    )
+    points = stream.XmRStream(
+        x_begin=x_begin,
+        x_cutoff=x_cutoff,
+        xmr_function=xmr_function,
+        window=None if window == "expanding" else window,
+    )
+
+    upper, lower, mR_upper, anomalies = [], [], [], []
+    for i, (x, y) in enumerate(zip(stats._x_Ser, counts)):
+        new_signals = points.append(x, y)
+        anomalies += [i for signal in new_signals if signal["rule"] == "anomaly"]
+        limits = points.npl_limit_values or {}
+        upper.append(limits.get("npl_upper_limit", np.nan))
+        lower.append(limits.get("npl_lower_limit", np.nan))
+        mR_upper.append((points.mR_limit_values or {}).get("mR_upper_limit", np.nan))
+
+    np.testing.assert_allclose(stats.npl_limit_values["npl_upper_limit"], upper)
+    np.testing.assert_allclose(stats.npl_limit_values["npl_lower_limit"], lower)
+    np.testing.assert_allclose(stats.mR_limit_values["mR_upper_limit"], mR_upper)
+    events = stats.signal_events
+    assert list(events[events["rule"] == "anomaly"]["start_idx"]) == anomalies
+
+
+@pytest.mark.parametrize("window", [1, 2, 7, 50])
+def test_running_median_matches_numpy(window):
+    rng = np.random.default_rng(window)
+    # Few distinct values, so removed values often equal values still in the window
+    values = np.concatenate(
+        [rng.integers(0, 5, 1000), np.arange(1000.0), rng.normal(0, 1, 1000)]
+    )
+    median = running_median.RunningMedian()
+    for i, value in enumerate(values):
+        median.add(value)
+        if i >= window:
+            median.remove(values[i - window])
+        assert median.value() == np.median(values[max(i - window + 1, 0) : i + 1])
+
+    # Removed values are dropped, so the heaps stay close to the window size
+    assert len(median._low) + len(median._high) <= 3 * window + 2
+    assert sum(map(len, median._removed.values())) <= 2 * window + 2
+
+
+def test_stream_signals_runs_once():
+    points = _run_series()
+    y = list(points["Value"])
+    full = xmr.XmRStats(points, "Value", "Period", x_cutoff="2021-08")
+    events = full.signal_events
+    assert not (events["rule"] == "anomaly").any()
+    assert list(
+        zip(events["rule"], events["direction"], events["start_idx"], events["end_idx"])
+    ) == [
+        ("long_run", "High", 20, 27),
+        ("short_run", "High", 29, 32),
+        ("long_run", "Low", 36, 47),
+        ("short_run", "High", 48, 55),
+    ]
+
+    points_stream = stream.XmRStream.from_xmr(
+        xmr.XmRStats(points.iloc[:20], "Value", "Period")
+    )
+    reported = []
+    for i, (x, value) in enumerate(zip(full._x_Ser[20:], y[20:]), 20):
+        for signal in points_stream.append(x, value):
+            reported.append(
+                (
+                    i,
+                    signal["rule"],
+                    signal["direction"],
+                    signal["start_idx"],
+                    signal["end_idx"],
+                )
+            )
+
+    # Each run is reported once, on the point that completes it. Runs that keep
+    #   growing are reported with the start of the run, and not again.
+    assert reported == [
+        (27, "long_run", "High", 20, 27),
+        (32, "short_run", "High", 29, 32),
+        (43, "long_run", "Low", 36, 43),
+        (51, "short_run", "High", 48, 51),
+    ]
+
+
+@pytest.mark.parametrize("window", [None, 5])
+def test_stream_memory_is_bounded(window):
+    points = stream.XmRStream(xmr_function="median", window=window)
+    points.extend(np.arange(1000), np.arange(1000.0) % 17)
+
+    assert len(points._window_y) == (0 if window is None else window)
+    assert len(points._window_mR) == (0 if window is None else window - 1)
+
+
+def test_rolling_limits_chart():
+    chart = xmr.XmR(data, "Count", "Period", window=4)
+    fig = chart.xmr_chart
+
+    # Limit lines are drawn as traces after the signal traces
+    assert len(fig.data) == 6 + 8
+    assert len(fig.layout.shapes) == 0
+    assert fig.layout.updatemenus[0].buttons[0].args[0]["visible"][6:] == [True] * 8
+
+
+def test_phase_limits_match_separate_charts():
+    stats = xmr.XmRStats(data, "Count", "Period", phases=["2023-05", "2023-09"])
+    upper = stats.npl_limit_values["npl_upper_limit"]
+
+    assert list(stats.phase_limits["n_points"]) == [4, 4, 4]
+    for phase, (start, stop) in enumerate([(0, 4), (4, 8), (8, 12)]):
+        separate = xmr.XmRStats(
+            data.iloc[start:stop].reset_index(drop=True), "Count", "Period"
+        )
+        expected = separate.npl_limit_values["npl_upper_limit"]
+        assert stats.phase_limits["npl_upper_limit"][phase] == pytest.approx(expected)
+        assert upper[start:stop] == pytest.approx([expected] * (stop - start))
+
+
+def test_phase_runs_do_not_cross_phases():
+    # The last 4 points of the first phase and the first 4 points of the second phase
+    #   are above the mid-line of their phase
+    values = [10.0, 12.0] * 6 + [13.0] * 4 + [33.0] * 4 + [30.0, 32.0] * 6
+    phase_data = DataFrame(
+        {"t": date_range("2020-01-01", periods=len(values), freq="D"), "y": values}
+    )
+    stats = xmr.XmRStats(
+        phase_data, "y", "t", date_part_resolution="day", phases=["2020-01-17"]
+    )
+
+    assert stats.signal_events.empty
+    chart = xmr.XmR(
+        phase_data, "y", "t", date_part_resolution="day", phases=["2020-01-17"]
+    )
+    # 8 stepped lines per phase and a boundary line on each chart
+    assert len(chart.xmr_chart.layout.shapes) == 8 * 2 + 2
+
+
+@pytest.mark.parametrize("phases", [["2023-07"], "auto"])
+def test_stream_from_phase_chart(phases):
+    stats = xmr.XmRStats(data, "Count", "Period", phases=phases)
+    last_phase = stats.phase_limits.iloc[-1]
+    points = stream.XmRStream.from_xmr(stats)
+
+    assert points.npl_limit_values["npl_upper_limit"] == pytest.approx(
+        last_phase["npl_upper_limit"]
+    )
+    assert points.append("2024-01", last_phase["y_xmr_func"]) == []
+    new_signals = points.append("2024-02", last_phase["npl_upper_limit"] + 1)
+    assert [signal["rule"] for signal in new_signals] == ["anomaly"]
+
+
+def test_changepoints():
+    rng = np.random.default_rng(0)
+    shifted = np.concatenate(
+        [rng.normal(10, 1, 300), rng.normal(13, 1, 200), rng.normal(11, 1, 500)]
+    )
+    found = changepoints.changepoints(shifted)
+
+    assert len(found) == 2
+    assert abs(found - [300, 500]).max() <= 3
+    assert len(changepoints.changepoints(shifted, max_changepoints=1)) == 1
+    assert len(changepoints.changepoints(rng.normal(10, 1, 1000))) == 0
+
+
+def test_auto_phases():
+    rng = np.random.default_rng(1)
+    values = np.concatenate([rng.normal(100, 5, 60), rng.normal(130, 5, 60)])
+    shifted = DataFrame(
+        {"t": date_range("2010-01-01", periods=len(values), freq="MS"), "y": values}
+    )
+    stats = xmr.XmRStats(shifted, "y", "t", phases="auto")
+
+    assert stats.phases == ["2015-01"]
+    assert list(stats.phase_limits["n_points"]) == [60, 60]
+
+
+def test_cache_reuses_limits_and_signals():
+    cache = lru_cache.LRUCache(max_size=2)
+    kwargs = {"x_cutoff": "2023-06", "cache": cache}
+    first = xmr.XmRStats(data, "Count", "Period", **kwargs)
+    second = xmr.XmRStats(data.copy(), "Count", "Period", profile=True, **kwargs)
+
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert second.profile_stats["counters"]["cache_hit"] == 1
+    assert "limits" not in second.profile_stats["stages"]
+    assert second.npl_limit_values == first.npl_limit_values
+    assert second.signals == first.signals
+    assert second.data_for_limits.shape[0] == 6
+
+    # Any change to the values or parameters is a different entry
+    changed = data.assign(Count=[c + 1 for c in counts])
+    xmr.XmRStats(changed, "Count", "Period", **kwargs)
+    xmr.XmRStats(data, "Count", "Period", xmr_function="median", **kwargs)
+    assert cache.stats()["misses"] == 3
+    assert cache.stats()["evictions"] == 1
+    assert len(cache) == 2
+
+
+def test_disk_cache(tmp_path):
+    cache = disk_cache.DiskCache(tmp_path / "cache")
+    first = xmr.XmR(data, "Count", "Period", cache=cache)
+    figure_json = first.to_json()
+
+    # A new cache object on the same directory, as after a restart
+    restarted = disk_cache.DiskCache(tmp_path / "cache")
+    second = xmr.XmR(data, "Count", "Period", cache=restarted)
+    assert second.to_json() == figure_json
+    assert second._xmr_chart is None
+    assert second.signals == first.signals
+    assert restarted.stats()["hits"] == 2
+
+    # Entries of another library version are never read
+    other = disk_cache.DiskCache(tmp_path / "cache", version="0.0.0")
+    assert other.get(first._cache_key) is None
+
+    small = disk_cache.DiskCache(tmp_path / "cache", max_bytes=len(figure_json))
+    small.put("key", "x")
+    assert small.stats()["evictions"] >= 1
+    assert small.stats()["bytes"] <= len(figure_json)
+    assert not list((tmp_path / "cache").glob("*.tmp"))
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"window": 4}, {"phases": ["2023-06"]}])
+@pytest.mark.parametrize("engine", ["json", "orjson"])
+def test_to_json_matches_figure(kwargs, engine, monkeypatch):
+    pytest.importorskip(engine)
+    import plotly.io as pio
+
+    monkeypatch.setattr(pio.json.config, "default_engine", engine)
+    gappy = data.assign(Count=[np.nan] + counts[1:])
+    chart = xmr.XmR(gappy, "Count", "Period", **kwargs)
+
+    assert chart.to_json() == chart.xmr_chart.to_json()
+
+
+def test_figure_json_matches_plotly():
+    import plotly.graph_objects as go
+    from spc_plotly.helpers import figure_json
+
+    fig = go.Figure(
+        data=[
+            go.Scatter(x=date_range("2023-01-01", periods=5), y=np.arange(5.0)),
+            go.Bar(x=np.array(["a", "b"], dtype=object), y=np.array([1, 2])),
+        ],
+        layout={"title": {"text": "Frames"}},
+        frames=[go.Frame(data=[go.Scatter(y=np.arange(5.0) * 2)], name="double")],
+    )
 
+    assert figure_json._figure_json(fig) == fig.to_json()
 
-def test_y_ser_name_val(y_ser_name, data):
-    if y_ser_name not in data.columns:
-        e = f"{y_ser_name} not a valid column"
-        raise ValueError(e)
 
-    return True
+def test_to_json_typed_arrays():
+    chart = xmr.XmR(data, "Count", "Period", x_cutoff="2023-06")
+    anomalies = [point[1] for point in chart.signals["anomalies"]]
+    assert anomalies
 
+    typed = json.loads(chart.to_json(typed_arrays=True))["data"]
+    plain = json.loads(chart.to_json(typed_arrays=False))["data"]
 
-def test_cutoff_val(cutoff_val, x_Ser):
-    if cutoff_val is None or cutoff_val in x_Ser.values:
-        return True
-    else:
-        print(cutoff_val)
-        print(x_Ser)
-        e = f"{cutoff_val} not present in {x_Ser.name}"
-        raise ValueError(e)
+    # Integer counts are sent as the smallest integer type that holds them
+    assert typed[0]["y"]["dtype"] == "i2"
+    assert typed[2]["y"]["dtype"] == "f8"
+    decoded = np.frombuffer(base64.b64decode(typed[2]["y"]["bdata"]), dtype="f8")
+    assert list(decoded) == anomalies
+    assert plain[0]["y"] == counts
+    assert plain[2]["y"] == anomalies
+    assert plain[0]["x"] == typed[0]["x"]
 
 
-def test_begin_val(begin_val, x_Ser):
-    if begin_val is None or begin_val in x_Ser.values:
-        return True
-    else:
-        print(begin_val)
-        print(x_Ser)
-        e = f"{begin_val} not present in {x_Ser.name}"
-        raise ValueError(e)
+def test_disk_cache_lists_directory_rarely(tmp_path, monkeypatch):
+    cache = disk_cache.DiskCache(tmp_path, max_bytes=20_000)
+    listings = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, "_entries", lambda: listings.append(1) or entries())
 
+    for i in range(250):
+        cache.put(str(i), "x" * 100)
 
-def test_sloped_val(sloped_val):
-    if not isinstance(sloped_val, bool):
-        e = f"sloped parameter must be a boolean value"
-        raise ValueError(e)
+    # Once on the first write, then when full or every rescan_interval writes
+    assert len(listings) < 250 / 10
+    assert cache.stats()["bytes"] <= 20_000
+    assert cache.stats()["evictions"] > 0
+    assert cache.get("249") == "x" * 100